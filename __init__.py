@@ -3,18 +3,35 @@ import os
 import re
 import shutil
 import json
+import math
+import time
+import zlib
+import hashlib
+import zipfile
 import mobase
 import ctypes
 import threading
-from typing import Callable, Dict, Iterable, List, TypeVar, cast, Optional, Union
+import queue
+import fnmatch
+import weakref
+import functools
+from abc import abstractmethod
+from contextlib import contextmanager
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+from typing import BinaryIO, TextIO, Callable, Container, Dict, Iterable, Iterator, List, Set, Tuple, TypeVar, cast, Optional, Union
 try:
-    from PyQt6.QtWidgets import QMainWindow, QGroupBox, QStackedWidget, QWidget, QApplication, QRadioButton, QPushButton, QCheckBox, QComboBox
-    from PyQt6.QtCore import QObject, qInfo, qDebug, qWarning, qCritical, pyqtSignal
-    from PyQt6.QtGui import QWindow, QGuiApplication
+    from PyQt6.QtWidgets import QMainWindow, QGroupBox, QStackedWidget, QWidget, QApplication, QRadioButton, QPushButton, QCheckBox, QComboBox, QBoxLayout, QLayout, QFileDialog, QInputDialog, QMessageBox
+    from PyQt6.QtCore import Qt, QObject, qInfo, qDebug, qWarning, qCritical, pyqtSignal
+    from PyQt6.QtGui import QWindow, QGuiApplication, QIcon
+    from PyQt6 import sip
 except ImportError:
-    from PyQt5.QtWidgets import QMainWindow, QGroupBox, QStackedWidget, QWidget, QApplication, QRadioButton, QPushButton, QCheckBox, QComboBox
-    from PyQt5.QtCore import QObject, qInfo, qDebug, qWarning, qCritical, pyqtSignal
-    from PyQt5.QtGui import QWindow, QGuiApplication
+    from PyQt5.QtWidgets import QMainWindow, QGroupBox, QStackedWidget, QWidget, QApplication, QRadioButton, QPushButton, QCheckBox, QComboBox, QBoxLayout, QLayout, QFileDialog, QInputDialog, QMessageBox
+    from PyQt5.QtCore import Qt, QObject, qInfo, qDebug, qWarning, qCritical, pyqtSignal
+    from PyQt5.QtGui import QWindow, QGuiApplication, QIcon
+    from PyQt5 import sip
 
 currentFileFolder = os.path.dirname(os.path.realpath(__file__))
 
@@ -71,22 +88,17 @@ def makeSavePathV3(organizer: mobase.IOrganizer, modName: str) -> str:
     return os.path.join(getSavesV3Folder(organizer), escapeFileName(modName) + ".json")
 
 def getSavesV3Folder(organizer: mobase.IOrganizer) -> str:
-    return os.path.join(
-        organizer.pluginDataPath(),
-        "remember_installation_choices",
-        "saves_v3",
-        escapeFileName(organizer.managedGame().gameName()),
-    )
-
-def makeSavePathV4(organizer: mobase.IOrganizer, modName: str) -> str:
-    return os.path.join(getSavesV4Folder(organizer), modName + ".json")
+    return getGameDataFolder(organizer.pluginDataPath(), "saves_v3", organizer.managedGame().gameName())
 
 def getSavesV4Folder(organizer: mobase.IOrganizer) -> str:
+    return getGameDataFolder(organizer.pluginDataPath(), "saves_v4", organizer.managedGame().gameName())
+
+def getGameDataFolder(pluginDataPath: str, folderName: str, gameName: str) -> str:
     return os.path.join(
-        organizer.pluginDataPath(),
+        pluginDataPath,
         "remember_installation_choices",
-        "saves_v4",
-        escapeFileName(organizer.managedGame().gameName()),
+        folderName,
+        escapeFileName(gameName),
     )
 
 def getFilePathsInFolder(folderPath: str, extension: str) -> List[str]:
@@ -97,7 +109,7 @@ def getFilePathsInFolder(folderPath: str, extension: str) -> List[str]:
                 filePaths.append(os.path.join(root, file))
     return filePaths
 
-def migrateSaves(organizer: mobase.IOrganizer) -> None:
+def migrateSaves(organizer: mobase.IOrganizer, store: "SaveStore") -> None:
     for oldSaveFolder, version in zip(
         [os.path.join(currentFileFolder, "saves"), getSavesV2Folder(organizer)],
         ["V1", "V2"],
@@ -132,6 +144,48 @@ def migrateSaves(organizer: mobase.IOrganizer) -> None:
                 logDebug(f"Moved old save '{oldPathShort}' with modtime={oldModTime} to path '{newPathShort}' (this file had modtime={newModTime}), because old save is newer or new save does not exist")
         logInfo("Save migration complete")
 
+    # V4 saves are full saves, except for records with "stepRefs" that were written to V4 folder by development builds.
+    # They are kept for older versions of the plugin, marker tells which ones were migrated: saves changed after it
+    # were written by an older version and are migrated again.
+    oldSaveFolder = getSavesV4Folder(organizer)
+    logDebug(f"migrateSaves: {oldSaveFolder}, V4")
+    markerPath = os.path.join(oldSaveFolder, "migrated_to_v5")
+    migratedTime = os.path.getmtime(markerPath) if os.path.exists(markerPath) else None
+    oldPaths = [path for path in getFilePathsInFolder(oldSaveFolder, ".json") if migratedTime is None or os.path.getmtime(path) > migratedTime]
+    if len(oldPaths) == 0:
+        logDebug("migrateSaves: no old V4 saves were found, skipping migration")
+        return
+
+    logInfo(f"Detected {len(oldPaths)} old V4 saves, will migrate to new version")
+
+    backupDir = oldSaveFolder + "_backup"
+    shutil.copytree(oldSaveFolder, backupDir, dirs_exist_ok=True)
+    logInfo(f"Created backup saves at '{backupDir}'")
+
+    hadStepRefs = False
+    for oldPath in oldPaths:
+        oldModTime = os.path.getmtime(oldPath)
+        modName, _ = os.path.splitext(os.path.relpath(oldPath, oldSaveFolder))
+        newModTime = store.saveTime(modName) or 0
+
+        if newModTime >= oldModTime:
+            logDebug(f"Skipped old save '{oldPath}' with modtime={oldModTime}, because there is newer save with modtime={newModTime}")
+        else:
+            data = store._readJson(oldPath)
+            if not isinstance(data, dict):
+                logCritical(f"Not migrating old save '{oldPath}', failed to read it")
+                continue
+            hadStepRefs = hadStepRefs or "stepRefs" in data
+            store.write(modName, store._loadRecord(data), oldModTime)
+            logDebug(f"Migrated old save '{oldPath}' with modtime={oldModTime} (new save had modtime={newModTime}), because old save is newer or new save does not exist")
+
+    store.flush()
+    if hadStepRefs:
+        # Reference counts of V4 records are not needed anymore, only saves of the store are counted.
+        store.recountStepRefs()
+    writeFileAtomic(markerPath, b"")
+    logInfo("Save migration complete")
+
 class DirectoryChangedNotify(QObject): # type: ignore
     directoryChanged = pyqtSignal(str, str)
 
@@ -266,6 +320,9 @@ class RememberModChoicesPlugin(mobase.IPlugin):
         self.currentInstallerDialog: Optional[FomodInstallerDialog] = None
         self.currentOverwriteDialog: Optional[QueryOverwriteDialog] = None
         self.pendingSave: Optional[FomodSave] = None
+        self._saveStore: Optional[SaveStore] = None
+        self._choiceStatistics: Optional[ChoiceStatistics] = None
+        self._savePrefetcher: Optional[SavePrefetcher] = None
 
     def init(self, organizer: mobase.IOrganizer):
         self._organizer = organizer
@@ -287,6 +344,38 @@ class RememberModChoicesPlugin(mobase.IPlugin):
         return mobase.VersionInfo(1, 2, 4, 0)
         # VERSION_END
 
+    def choiceStatistics(self) -> "ChoiceStatistics":
+        if not self._choiceStatistics:
+            self._choiceStatistics = ChoiceStatistics(os.path.join(
+                getGameDataFolder(self._organizer.pluginDataPath(), "stats_v1", self._organizer.managedGame().gameName()),
+                "choices.json",
+            ), self.saveStore())
+        return self._choiceStatistics
+
+    def saveStore(self) -> "SaveStore":
+        if not self._saveStore:
+            self._saveStore = SaveStore.fromOrganizer(self._organizer, self.saveEncoding(), self.historySize())
+        return self._saveStore
+
+    def savePrefetcher(self) -> "SavePrefetcher":
+        """
+        Prefetcher of the current installation, dialogs hold it by weak reference.
+        """
+        if not self._savePrefetcher:
+            self._savePrefetcher = SavePrefetcher(self.saveStore())
+        return self._savePrefetcher
+
+    def startSavePrefetcher(self) -> "SavePrefetcher":
+        # Saves prefetched for the previous archive are not needed anymore.
+        self.closeSavePrefetcher(self._savePrefetcher)
+        return self.savePrefetcher()
+
+    def closeSavePrefetcher(self, prefetcher: Optional["SavePrefetcher"]) -> None:
+        # Prefetched saves are outdated once the mod is installed.
+        if prefetcher and prefetcher is self._savePrefetcher:
+            prefetcher.close()
+            self._savePrefetcher = None
+
     def _setting(self, key: str) -> object:
         return self._organizer.pluginSetting(self.name(), key)
 
@@ -305,12 +394,64 @@ class RememberModChoicesPlugin(mobase.IPlugin):
     def disabledHintChoiceStyleSheet(self) -> str:
         return str(self._setting("hint_choice_disabled_style_sheet"))
 
+    def renamedChoiceStyleSheet(self) -> str:
+        return str(self._setting("renamed_choice_style_sheet"))
+
+    def disabledRenamedChoiceStyleSheet(self) -> str:
+        return str(self._setting("renamed_choice_disabled_style_sheet"))
+
+    def renamedChoiceMinSimilarity(self) -> Optional[float]:
+        """
+        Returns None if renamed steps, groups and choices shouldn't be matched.
+        """
+        if not bool(self._setting("match_renamed_choices")):
+            return None
+        try:
+            return min(1.0, max(0.0, float(cast(float, self._setting("renamed_choice_min_similarity")))))
+        except (TypeError, ValueError):
+            return 0.8
+
     def autoSelectPreviousChoices(self) -> bool:
         return bool(self._setting("auto_select_previous_choices"))
     
+    def saveEncoding(self) -> str:
+        encoding = str(self._setting("save_encoding"))
+        if encoding not in SaveEncoding.ALL:
+            logCritical(f"Unknown save encoding '{encoding}', expected one of {SaveEncoding.ALL}, using '{SaveEncoding.BINARY}'")
+            return SaveEncoding.BINARY
+        return encoding
+
+    def showUsualChoiceHints(self) -> bool:
+        return bool(self._setting("usual_choice_hints"))
+
+    def usualChoiceStyleSheet(self) -> str:
+        return str(self._setting("usual_choice_style_sheet"))
+
+    def disabledUsualChoiceStyleSheet(self) -> str:
+        return str(self._setting("usual_choice_disabled_style_sheet"))
+
+    def historySize(self) -> int:
+        return max(0, int(cast(int, self._setting("history_size"))))
+
+    def orphanedSavesAction(self) -> str:
+        action = str(self._setting("orphaned_saves_action"))
+        if action not in SweepAction.ALL:
+            logCritical(f"Unknown orphaned saves action '{action}', expected one of {SweepAction.ALL}, using '{SweepAction.REPORT}'")
+            return SweepAction.REPORT
+        return action
+
     def dumpInstallerDialogWidgetTree(self) -> bool:
         return bool(self._setting("xdebug_dump_installer_dialog_widget_tree"))
 
+    def dumpWidgetTreeMaxDepth(self) -> int:
+        return max(0, int(cast(int, self._setting("xdebug_dump_widget_tree_max_depth"))))
+
+    def dumpWidgetTreeFilters(self) -> List[str]:
+        return [pattern.strip() for pattern in str(self._setting("xdebug_dump_widget_tree_filter")).split(",") if pattern.strip()]
+
+    def dumpWidgetTreeDiff(self) -> bool:
+        return bool(self._setting("xdebug_dump_widget_tree_diff"))
+
     def dumpStep(self) -> bool:
         return bool(self._setting("xdebug_dump_step"))
 
@@ -322,13 +463,28 @@ class RememberModChoicesPlugin(mobase.IPlugin):
             mobase.PluginSetting("hint_choice_style_sheet", "Style sheet to apply to clickable choices", "background-color: rgba(255, 255, 0, 0.25)"),
             mobase.PluginSetting("hint_choice_disabled_style_sheet", "Style sheet to apply to unclickable choices", "background-color: rgba(255, 255, 0, 0.15)"),
             mobase.PluginSetting("auto_select_previous_choices", "Automatically selects previous choices", False),
+            mobase.PluginSetting("match_renamed_choices", "Match choices that were renamed in new mod version with similar choices from your previous installation", True),
+            mobase.PluginSetting("renamed_choice_min_similarity", "How similar renamed choice text has to be, from 0 to 1", 0.8),
+            mobase.PluginSetting("renamed_choice_style_sheet", "Style sheet to apply to clickable choices matched by similar text", "background-color: rgba(255, 128, 0, 0.25)"),
+            mobase.PluginSetting("renamed_choice_disabled_style_sheet", "Style sheet to apply to unclickable choices matched by similar text", "background-color: rgba(255, 128, 0, 0.15)"),
+            mobase.PluginSetting("usual_choice_hints", "Highlight choices you usually pick in other mods when installing a mod for the first time", True),
+            mobase.PluginSetting("usual_choice_style_sheet", "Style sheet to apply to clickable choices you usually pick", "background-color: rgba(0, 128, 255, 0.2)"),
+            mobase.PluginSetting("usual_choice_disabled_style_sheet", "Style sheet to apply to unclickable choices you usually pick", "background-color: rgba(0, 128, 255, 0.12)"),
+            mobase.PluginSetting("save_encoding", "Format of saved steps: 'json', 'binary' or 'binary_zlib'", "binary"),
+            mobase.PluginSetting("history_size", "How many previous installations of every mod to remember", 5),
+            mobase.PluginSetting("orphaned_saves_action", "What to do on startup with saves of mods that no longer exist: 'off', 'report', 'quarantine' or 'delete'", "report"),
             mobase.PluginSetting("xdebug_dump_installer_dialog_widget_tree", "", False),
+            mobase.PluginSetting("xdebug_dump_widget_tree_max_depth", "Widgets deeper than this are not dumped, 0 is no limit", 0),
+            mobase.PluginSetting("xdebug_dump_widget_tree_filter", "Comma separated objectName or class name patterns, e.g. 'stepsStack, QGroupBox', only matching widgets are dumped with their children", ""),
+            mobase.PluginSetting("xdebug_dump_widget_tree_diff", "Dump whole widget tree once, then only widgets that changed on every step", False),
             mobase.PluginSetting("xdebug_dump_step", "", False),
         ]
     
     def _onUserInterfaceInitialized(self, mainWindow: QMainWindow):
         try:
-            migrateSaves(self._organizer)
+            # Other MO2 instances can use the same plugin data folder.
+            with self.saveStore().exclusive():
+                migrateSaves(self._organizer, self.saveStore())
         except Exception as e:
             logCritical(f"Failed to migrate old saves: {e}")
 
@@ -338,22 +494,54 @@ class RememberModChoicesPlugin(mobase.IPlugin):
 
         self._organizer.modList().onModInstalled(self._onModInstalled)
         watchDirectory(self._organizer.modsPath(), self._modNameChanged)
+        self._startOrphanedSavesSweep()
+
+        statistics = self.choiceStatistics()
+        if not statistics.exists():
+            # Scans all saves once, after that statistics are updated with every installed mod.
+            thread = threading.Thread(target=rebuildChoiceStatisticsThread, args=[statistics], daemon=True)
+            thread.start()
+
+    def _startOrphanedSavesSweep(self) -> None:
+        action = self.orphanedSavesAction()
+        if action == SweepAction.OFF:
+            return
+
+        # Mods that exist on disk but were not picked up by mod list yet still count.
+        modNames = set(self._organizer.modList().allMods())
+        try:
+            modNames.update(entry.name for entry in os.scandir(self._organizer.modsPath()) if entry.is_dir())
+        except OSError as e:
+            logCritical(f"Not sweeping orphaned saves, failed to list mods folder: {e}")
+            return
+
+        sweeper = SaveSweeper(
+            self.saveStore(),
+            getGameDataFolder(self._organizer.pluginDataPath(), "sweeper_v1", self._organizer.managedGame().gameName()),
+            self.choiceStatistics(),
+        )
+        instance = SaveSweeper.instanceKey(self._organizer.modsPath())
+        thread = threading.Thread(target=sweepSavesThread, args=[sweeper, instance, modNames, action], daemon=True)
+        thread.start()
 
     def _onModInstalled(self, mod: mobase.IModInterface) -> None:
         if self.pendingSave:
-            path = makeSavePathV4(self._organizer, mod.name())
-            os.makedirs(os.path.dirname(path), exist_ok=True)
-            with open(path, "w") as file:
-                json.dump(self.pendingSave.toDict(), file, indent=4)
-            logDebug(f"onModInstalled: pending save data was saved into '{path}'")
-            self.pendingSave = None
-
-            # Remove save in older format.
-            oldPath = makeSavePathV3(self._organizer, mod.name())
+            store = self.saveStore()
             try:
-                os.remove(oldPath)
-            except FileNotFoundError:
-                pass
+                # Statistics count changes of saves in the order they are made.
+                with store.exclusive():
+                    previousSave = store.load(mod.name())
+                    store.write(mod.name(), self.pendingSave)
+                    logDebug(f"onModInstalled: pending save data was saved into '{store.savePath(mod.name())}'")
+                    self.choiceStatistics().replaceSave(mod.name(), previousSave, self.pendingSave)
+            except OSError as e:
+                # Includes 'TimeoutError' when another MO2 instance holds the store lock for too long.
+                logCritical(f"Failed to save installation choices of '{mod.name()}': {e}")
+            finally:
+                # Save of this mod must not be written for the next installed mod.
+                self.pendingSave = None
+        # Mods installed without installer dialog don't close their prefetcher.
+        self.closeSavePrefetcher(self._savePrefetcher)
 
     def _focusWindowChanged(self, window: Optional[QWindow]):
         if window != None:
@@ -383,47 +571,191 @@ class RememberModChoicesPlugin(mobase.IPlugin):
 
     def _modNameChanged(self, oldName: str, newName: str) -> None:
         logDebug(f"Mod name changed: old name '{oldName}', new name '{newName}'")
-        for oldSavePath in [
-            makeSavePathV4(self._organizer, oldName),
-            makeSavePathV3(self._organizer, oldName),
-        ]:
-            if not os.path.exists(oldSavePath):
+        try:
+            self.saveStore().rename(oldName, newName)
+        except OSError as e:
+            logCritical(f"Failed to rename installation choices of '{oldName}' to '{newName}': {e}")
+
+class WidgetTreeDumper():
+    """
+    Writes widget tree of installer dialog to JSON file, to find out how to read installers that plugin doesn't understand.
+    """
+    TREE_FILE_NAME = "debug_dump_children.json"
+    DIFF_FILE_NAME = "debug_dump_children_diff.ndjson"
+    # Records are queued in batches, so that worker thread doesn't wake up for every widget.
+    BATCH_SIZE = 256
+
+    def __init__(self, root: QObject, folder: str, maxDepth: int = 0, filters: Optional[List[str]] = None, diff: bool = False):
+        """
+        maxDepth: children deeper than this are not dumped, 0 is no limit.
+        filters: objectName or class name patterns ('fnmatch' syntax), only matching objects are dumped with their children.
+        """
+        self.root = root
+        self.treePath = os.path.join(folder, WidgetTreeDumper.TREE_FILE_NAME)
+        self.diffPath = os.path.join(folder, WidgetTreeDumper.DIFF_FILE_NAME)
+        self.maxDepth = maxDepth
+        self.filters = filters or []
+        self.diff = diff
+        self._numDumps = 0
+        self._queue: "queue.SimpleQueue[Optional[Tuple[str, object]]]" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        # Used only by worker thread.
+        self._file: Optional[TextIO] = None
+        self._openDepth = 0
+        self._isFirstChild = True
+        self._label = ""
+        self._snapshot: Optional[Dict[str, Dict[str, object]]] = None
+        self._previousSnapshot: Optional[Dict[str, Dict[str, object]]] = None
+
+    def dump(self, label: str) -> None:
+        """
+        Queues current state of widget tree to be written. Must be called on UI thread.
+        """
+        if not self._thread:
+            self._thread = threading.Thread(target=dumpWidgetTreeThread, args=[self], daemon=True)
+            self._thread.start()
+        self._queue.put(("begin", label))
+        batch: List[Tuple[int, str, Dict[str, object]]] = []
+        for record in self._iterRecords():
+            batch.append(record)
+            if len(batch) >= WidgetTreeDumper.BATCH_SIZE:
+                self._queue.put(("records", batch))
+                batch = []
+        self._queue.put(("records", batch))
+        self._queue.put(("end", label))
+        self._numDumps += 1
+
+    def close(self) -> None:
+        """
+        Lets worker thread exit after it has written everything that was queued.
+        """
+        if self._thread:
+            self._queue.put(None)
+            self._thread = None
+
+    def _matches(self, obj: QObject) -> bool:
+        names = (obj.objectName(), obj.__class__.__name__)
+        return any(fnmatch.fnmatchcase(name, pattern) for pattern in self.filters for name in names)
+
+    def _iterRecords(self) -> Iterator[Tuple[int, str, Dict[str, object]]]:
+        """
+        Yields (depth in written tree, key, fields) of objects in pre-order, objects that don't match filters are skipped.
+        """
+        isRootWidget = isinstance(self.root, QWidget)
+        # (object, depth in widget tree, depth in written tree, is inside matching object, is parent visible to root).
+        # Visibility is passed down instead of calling 'isVisibleTo' that walks up to root for every widget.
+        stack: List[Tuple[QObject, int, int, bool, bool]] = [(child, 1, 0, not self.filters, True) for child in reversed(self.root.children())]
+        while stack:
+            obj, depth, writtenDepth, isIncluded, isVisible = stack.pop()
+            isWidget = isinstance(obj, QWidget)
+            if isWidget:
+                # Same as 'isVisibleTo': hidden widget hides its children, but other windows are not hidden by their parent.
+                isVisible = not obj.isHidden() and (isVisible or obj.isWindow())
+            isIncluded = isIncluded or self._matches(obj)
+            if isIncluded:
+                className = obj.__class__.__name__
+                fields: Dict[str, object] = {
+                    "object": className,
+                    "objectName": obj.objectName(),
+                }
+                if isWidget and isRootWidget:
+                    fields["isVisible"] = isVisible
+                if isinstance(obj, (QRadioButton, QPushButton, QCheckBox)):
+                    fields["text"] = obj.text()
+                if isinstance(obj, (QRadioButton, QCheckBox)):
+                    fields["isChecked"] = obj.isChecked()
+                elif isinstance(obj, QGroupBox):
+                    fields["title"] = obj.title()
+                key = f"{className}#{fields['objectName']}@{sip.unwrapinstance(obj):x}" if self.diff else ""
+                yield (writtenDepth, key, fields)
+            if self.maxDepth > 0 and depth >= self.maxDepth:
                 continue
+            childWrittenDepth = writtenDepth + 1 if isIncluded else writtenDepth
+            stack.extend((child, depth + 1, childWrittenDepth, isIncluded, isVisible) for child in reversed(obj.children()))
 
-            newSavePath = makeSavePathV4(self._organizer, newName)
-            if oldSavePath == newSavePath:
-                break
-            try:
-                os.remove(newSavePath)
-            except FileNotFoundError:
-                pass
-            os.rename(oldSavePath, newSavePath)
-            logDebug(f"Renamed save file '{oldSavePath}' to '{newSavePath}'")
-            break
-
-def dumpChildrenWriteFile(obj: QObject):
-    with open(os.path.join(currentFileFolder, "debug_dump_children.json"), "w") as file:
-        json.dump(dumpChildren(obj, obj), file, indent=4)
-
-def dumpChildren(obj: QObject, rootObj: QObject) -> List[Dict[str, object]]:
-    root = []
-    for child in obj.children():
-        data: Dict[str, object] = {
-            "object": str(child.__class__.__name__),
-            "objectName": child.objectName(),
+    def _begin(self, label: str) -> None:
+        self._label = label
+        self._snapshot = {} if self.diff else None
+        if self.diff and self._previousSnapshot is not None:
+            return
+        self._file = open(self.treePath, "w", encoding="utf-8")
+        self._file.write("[")
+        self._openDepth = 0
+        self._isFirstChild = True
+        if self.diff:
+            # New dialog, diffs of previous dialog are no longer relevant.
+            open(self.diffPath, "w").close()
+
+    def _writeRecords(self, records: List[Tuple[int, str, Dict[str, object]]]) -> None:
+        if self._snapshot is not None:
+            self._snapshot.update((key, fields) for _, key, fields in records)
+        if not self._file:
+            return
+        chunks: List[str] = []
+        for depth, _, fields in records:
+            if self._openDepth > depth:
+                chunks.append("]}" * (self._openDepth - depth))
+                self._openDepth = depth
+                self._isFirstChild = False
+            if not self._isFirstChild:
+                chunks.append(",")
+            # Object is left open, its children are written into 'children' as they come.
+            chunks.append("\n" + "  " * depth + json.dumps(fields)[:-1] + ', "children": [')
+            self._openDepth += 1
+            self._isFirstChild = True
+        self._file.write("".join(chunks))
+
+    def _end(self) -> None:
+        if self._file:
+            self._file.write("]}" * self._openDepth + "\n]\n")
+            self._file.close()
+            self._file = None
+        elif self._snapshot is not None and self._previousSnapshot is not None:
+            self._writeDiff(self._previousSnapshot, self._snapshot)
+        self._previousSnapshot = self._snapshot
+        self._snapshot = None
+
+    def _writeDiff(self, before: Dict[str, Dict[str, object]], after: Dict[str, Dict[str, object]]) -> None:
+        changed: List[Dict[str, object]] = []
+        for key, fields in after.items():
+            oldFields = before.get(key)
+            if oldFields is not None and oldFields != fields:
+                changed.append({"key": key, "fields": {
+                    name: [oldFields.get(name), value] for name, value in fields.items() if oldFields.get(name) != value
+                }})
+                # Text of changed checkbox tells which choice it is.
+                for name in ("text", "title"):
+                    if name in fields:
+                        changed[-1][name] = fields[name]
+        line = {
+            "label": self._label,
+            "added": [dict(fields, key=key) for key, fields in after.items() if key not in before],
+            "removed": [key for key in before if key not in after],
+            "changed": changed,
         }
+        with open(self.diffPath, "a", encoding="utf-8") as file:
+            file.write(json.dumps(line) + "\n")
 
-        if isinstance(child, QWidget) and isinstance(rootObj, QWidget):
-            data["isVisible"] = child.isVisibleTo(rootObj)
-
-        if isinstance(child, (QRadioButton, QPushButton, QCheckBox)):
-            data["text"] = child.text()
-        elif isinstance(child, QGroupBox):
-            data["title"] = child.title()
-        
-        data["children"] = dumpChildren(child, rootObj)
-        root.append(data)
-    return root
+def dumpWidgetTreeThread(dumper: WidgetTreeDumper) -> None:
+    while True:
+        message = dumper._queue.get()
+        if message is None:
+            return
+        kind, value = message
+        try:
+            if kind == "begin":
+                dumper._begin(cast(str, value))
+            elif kind == "records":
+                dumper._writeRecords(cast(List[Tuple[int, str, Dict[str, object]]], value))
+            else:
+                dumper._end()
+        except Exception as e:
+            # Dump is only for debugging, failed one is skipped and in diff mode next one is written as whole tree.
+            logCritical(f"Failed to dump widget tree: {e}")
+            if dumper._file:
+                dumper._file.close()
+                dumper._file = None
+            dumper._snapshot = None
 
 T = TypeVar('T', "FomodGroupSave", "FomodStepSave", "FomodChoiceSave")
 def findWidgetListObject(
@@ -449,6 +781,77 @@ def findWidgetListObject(
     logCritical(f"There are multiple {objectName}s with same name '{title}', couldn't disambiguate between them, choices for this {objectName} probably will be incorrect")
     return matchingObjects[0]
 
+def textTrigrams(text: str) -> Set[str]:
+    """
+    Returns trigrams of text with case and punctuation ignored, so that "Option A (2K)" and "Option A - 2K" are equal.
+    """
+    padded = "  " + " ".join(re.findall(r"[^\W_]+", text.lower())) + " "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class FuzzyTextIndex():
+    """
+    Trigram index over texts of saved steps, groups or choices, used to find objects that were renamed between mod versions.
+    """
+    def __init__(self, texts: List[str]):
+        self.size = len(texts)
+        self._trigrams: List[Set[str]] = []
+        self._postings: Dict[str, List[int]] = {}
+        for index, text in enumerate(texts):
+            trigrams = textTrigrams(text)
+            self._trigrams.append(trigrams)
+            for trigram in trigrams:
+                self._postings.setdefault(trigram, []).append(index)
+
+    def similarities(self, text: str, minSimilarity: float) -> Dict[int, float]:
+        """
+        Returns similarity of indexed texts that are at least 'minSimilarity' similar to 'text', by text index.
+        """
+        trigrams = textTrigrams(text)
+        # Text with similarity S shares at least S * N / (2 - S) of N trigrams, so it has to share at least one
+        # of the rarest trigrams that remain after dropping that many minus one most common trigrams.
+        minCommonCount = max(1, math.ceil(minSimilarity * len(trigrams) / (2 - minSimilarity) - 1e-9))
+        rarestTrigrams = sorted(trigrams, key=lambda trigram: len(self._postings.get(trigram, ())))
+        candidates: Set[int] = set()
+        for trigram in rarestTrigrams[:len(trigrams) - minCommonCount + 1]:
+            candidates.update(self._postings.get(trigram, ()))
+
+        result: Dict[int, float] = {}
+        for index in candidates:
+            indexTrigrams = self._trigrams[index]
+            similarity = 2 * len(trigrams & indexTrigrams) / (len(trigrams) + len(indexTrigrams))
+            if similarity >= minSimilarity:
+                result[index] = similarity
+        return result
+
+def findWidgetListObjectFuzzy(
+    objects: List[T],
+    index: Optional[FuzzyTextIndex],
+    title: str,
+    wantedWidgetIndex: int,
+    minSimilarity: float,
+    excluded: Container[Optional[T]] = (),
+) -> Tuple[Optional[T], FuzzyTextIndex, float]:
+    """
+    Finds object with text most similar to 'title' that is not in 'excluded', ties are resolved in favor of
+    'wantedWidgetIndex'. Returns found object, index to cache for next lookups in the same list, and similarity.
+    """
+    if not index or index.size != len(objects):
+        index = FuzzyTextIndex([object.getText() for object in objects])
+
+    bestObject: Optional[T] = None
+    bestSimilarity = 0.0
+    for objectIndex, similarity in index.similarities(title, minSimilarity).items():
+        if similarity < bestSimilarity:
+            continue
+        object = objects[objectIndex]
+        if similarity == bestSimilarity and bestObject and (bestObject.widgetIndex == wantedWidgetIndex or object.widgetIndex != wantedWidgetIndex):
+            continue
+        if object in excluded:
+            continue
+        bestObject = object
+        bestSimilarity = similarity
+    return bestObject, index, bestSimilarity
+
 class FomodChoiceSave():
     def __init__(self, save: Optional[Dict[str, object]] = None):
         self.text = ""
@@ -475,6 +878,9 @@ class FomodChoiceSave():
         }
 
 class FomodGroupSave():
+    # Built on first fuzzy lookup. Class attribute, so that objects created by 'decodeSave' have it too.
+    _choiceIndex: Optional[FuzzyTextIndex] = None
+
     def __init__(self, save: Optional[Dict[str, object]] = None):
         self.title = ""
         self.widgetIndex: int = -1
@@ -494,6 +900,10 @@ class FomodGroupSave():
     def findChoice(self, text: str, wantedWidgetIndex: int) -> Optional[FomodChoiceSave]:
         return findWidgetListObject(self.choices, 'choice', text, wantedWidgetIndex)
 
+    def findChoiceFuzzy(self, text: str, wantedWidgetIndex: int, minSimilarity: float, excluded: Container[Optional[FomodChoiceSave]] = ()) -> Tuple[Optional[FomodChoiceSave], float]:
+        choice, self._choiceIndex, similarity = findWidgetListObjectFuzzy(self.choices, self._choiceIndex, text, wantedWidgetIndex, minSimilarity, excluded)
+        return choice, similarity
+
     def toDict(self) -> Dict[str, object]:
         return {
             "title": self.title,
@@ -502,6 +912,8 @@ class FomodGroupSave():
         }
 
 class FomodStepSave():
+    _groupIndex: Optional[FuzzyTextIndex] = None
+
     def __init__(self, save: Optional[Dict[str, object]] = None):
         self.title: str = ""
         self.widgetIndex: int = -1
@@ -521,6 +933,10 @@ class FomodStepSave():
     def findGroup(self, title: str, wantedWidgetIndex: int) -> Optional[FomodGroupSave]:
         return findWidgetListObject(self.groups, 'group', title, wantedWidgetIndex)
 
+    def findGroupFuzzy(self, title: str, wantedWidgetIndex: int, minSimilarity: float, excluded: Container[Optional[FomodGroupSave]] = ()) -> Tuple[Optional[FomodGroupSave], float]:
+        group, self._groupIndex, similarity = findWidgetListObjectFuzzy(self.groups, self._groupIndex, title, wantedWidgetIndex, minSimilarity, excluded)
+        return group, similarity
+
     def toDict(self) -> Dict[str, object]:
         return {
             "title": self.title,
@@ -529,6 +945,8 @@ class FomodStepSave():
         }
 
 class FomodSave():
+    _stepIndex: Optional[FuzzyTextIndex] = None
+
     def __init__(self, save: Optional[Dict[str, object]] = None):
         self.steps: List[FomodStepSave] = []
   
@@ -538,6 +956,10 @@ class FomodSave():
 
     def findStep(self, title: str, wantedWidgetIndex: int) -> Optional[FomodStepSave]:
         return findWidgetListObject(self.steps, 'step', title, wantedWidgetIndex)
+
+    def findStepFuzzy(self, title: str, wantedWidgetIndex: int, minSimilarity: float) -> Tuple[Optional[FomodStepSave], float]:
+        step, self._stepIndex, similarity = findWidgetListObjectFuzzy(self.steps, self._stepIndex, title, wantedWidgetIndex, minSimilarity)
+        return step, similarity
     
     def upsertStep(self, newStep: FomodStepSave) -> None:
         for index, step in enumerate(self.steps):
@@ -551,20 +973,2044 @@ class FomodSave():
             "steps": list(map(lambda x: x.toDict(), self.steps)),
         }
 
+class SaveEncoding():
+    JSON = "json"
+    BINARY = "binary"
+    BINARY_ZLIB = "binary_zlib"
+
+    ALL = (JSON, BINARY, BINARY_ZLIB)
+
+# Binary save layout, all integers are LEB128 varints, widget indices are zigzag encoded since they are often -1:
+#   "RICS", format version byte, flags byte (BINARY_SAVE_FLAG_ZLIB), then payload, compressed with zlib if flag is set:
+#   string count, strings (byte length + UTF-8), step count, steps
+#   step:   title string index, widget index, group count, groups
+#   group:  title string index, widget index, choice count, choices, isChecked bits of choices (LSB first)
+#   choice: text string index, widget index
+# Every text is stored once in string table, so repeated group and choice texts cost one varint.
+BINARY_SAVE_MAGIC = b"RICS"
+BINARY_SAVE_VERSION = 1
+BINARY_SAVE_FLAG_ZLIB = 0x01
+
+class SaveDecodeError(Exception):
+    pass
+
+def _writeVarint(out: bytearray, value: int) -> None:
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+def _writeSignedVarint(out: bytearray, value: int) -> None:
+    _writeVarint(out, (value << 1) if value >= 0 else ((-value << 1) - 1))
+
+def encodeSave(save: FomodSave, compress: bool = False) -> bytes:
+    strings: Dict[str, int] = {}
+    def intern(text: str) -> int:
+        index = strings.get(text)
+        if index is None:
+            index = strings[text] = len(strings)
+        return index
+
+    body = bytearray()
+    _writeVarint(body, len(save.steps))
+    for step in save.steps:
+        _writeVarint(body, intern(step.title))
+        _writeSignedVarint(body, step.widgetIndex)
+        _writeVarint(body, len(step.groups))
+        for group in step.groups:
+            _writeVarint(body, intern(group.title))
+            _writeSignedVarint(body, group.widgetIndex)
+            _writeVarint(body, len(group.choices))
+            checkedBits = 0
+            for index, choice in enumerate(group.choices):
+                _writeVarint(body, intern(choice.text))
+                _writeSignedVarint(body, choice.widgetIndex)
+                if choice.isChecked:
+                    checkedBits |= 1 << index
+            body += checkedBits.to_bytes((len(group.choices) + 7) // 8, "little")
+
+    payload = bytearray()
+    _writeVarint(payload, len(strings))
+    for text in strings:
+        encoded = text.encode("utf-8")
+        _writeVarint(payload, len(encoded))
+        payload += encoded
+    payload += body
+
+    flags = 0
+    if compress:
+        flags |= BINARY_SAVE_FLAG_ZLIB
+        payload = bytearray(zlib.compress(payload))
+    return BINARY_SAVE_MAGIC + bytes((BINARY_SAVE_VERSION, flags)) + payload
+
+def _readVarintTail(data: bytes, pos: int, firstByte: int) -> Tuple[int, int]:
+    result = firstByte & 0x7F
+    shift = 7
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+def isBinarySave(data: bytes) -> bool:
+    return data[:len(BINARY_SAVE_MAGIC)] == BINARY_SAVE_MAGIC
+
+def decodeSave(data: bytes) -> FomodSave:
+    """
+    Builds 'FomodSave' from 'encodeSave' output in one pass, without intermediate dicts.
+    """
+    if not isBinarySave(data) or len(data) < 6:
+        raise SaveDecodeError("not a binary save")
+    if data[4] != BINARY_SAVE_VERSION:
+        raise SaveDecodeError(f"unsupported binary save version {data[4]}")
+
+    payload = data[6:]
+    if data[5] & BINARY_SAVE_FLAG_ZLIB:
+        try:
+            payload = zlib.decompress(payload)
+        except zlib.error as e:
+            raise SaveDecodeError(f"failed to decompress: {e}")
+
+    # Varints are read inline, nearly all of them fit into a single byte and function calls dominate otherwise.
+    # Objects are created without running constructors, every attribute that constructors set is assigned here
+    # (lazily built fuzzy indices are class attributes).
+    try:
+        pos = 0
+        count = payload[pos]; pos += 1
+        if count >= 0x80: count, pos = _readVarintTail(payload, pos, count)
+        strings: List[str] = []
+        for _ in range(count):
+            length = payload[pos]; pos += 1
+            if length >= 0x80: length, pos = _readVarintTail(payload, pos, length)
+            if pos + length > len(payload):
+                raise IndexError("string is out of bounds")
+            strings.append(payload[pos:pos + length].decode("utf-8"))
+            pos += length
+
+        save = FomodSave()
+        steps = save.steps
+        newObject = object.__new__
+        numSteps = payload[pos]; pos += 1
+        if numSteps >= 0x80: numSteps, pos = _readVarintTail(payload, pos, numSteps)
+        for _ in range(numSteps):
+            step = newObject(FomodStepSave)
+            value = payload[pos]; pos += 1
+            if value >= 0x80: value, pos = _readVarintTail(payload, pos, value)
+            step.title = strings[value]
+            value = payload[pos]; pos += 1
+            if value >= 0x80: value, pos = _readVarintTail(payload, pos, value)
+            step.widgetIndex = (value >> 1) ^ -(value & 1)
+            step.groups = groups = []
+            numGroups = payload[pos]; pos += 1
+            if numGroups >= 0x80: numGroups, pos = _readVarintTail(payload, pos, numGroups)
+            for _ in range(numGroups):
+                group = newObject(FomodGroupSave)
+                value = payload[pos]; pos += 1
+                if value >= 0x80: value, pos = _readVarintTail(payload, pos, value)
+                group.title = strings[value]
+                value = payload[pos]; pos += 1
+                if value >= 0x80: value, pos = _readVarintTail(payload, pos, value)
+                group.widgetIndex = (value >> 1) ^ -(value & 1)
+                group.choices = choices = []
+                numChoices = payload[pos]; pos += 1
+                if numChoices >= 0x80: numChoices, pos = _readVarintTail(payload, pos, numChoices)
+                for _ in range(numChoices):
+                    choice = newObject(FomodChoiceSave)
+                    value = payload[pos]; pos += 1
+                    if value >= 0x80: value, pos = _readVarintTail(payload, pos, value)
+                    choice.text = strings[value]
+                    value = payload[pos]; pos += 1
+                    if value >= 0x80: value, pos = _readVarintTail(payload, pos, value)
+                    choice.widgetIndex = (value >> 1) ^ -(value & 1)
+                    choices.append(choice)
+                numBitBytes = (numChoices + 7) // 8
+                if pos + numBitBytes > len(payload):
+                    raise IndexError("isChecked bits are out of bounds")
+                checkedBits = int.from_bytes(payload[pos:pos + numBitBytes], "little")
+                pos += numBitBytes
+                for choice in choices:
+                    choice.isChecked = bool(checkedBits & 1)
+                    checkedBits >>= 1
+                groups.append(group)
+            steps.append(step)
+        if pos != len(payload):
+            raise IndexError(f"{len(payload) - pos} unexpected bytes after the end")
+    except (IndexError, UnicodeDecodeError) as e:
+        raise SaveDecodeError(f"truncated or corrupted binary save: {e}")
+    return save
+
+def readSaveFile(path: str) -> Optional[FomodSave]:
+    """
+    Reads save file in any format: binary, or JSON with full steps. Returns None if file does not exist.
+    """
+    try:
+        with open(path, "rb") as file:
+            data = file.read()
+    except FileNotFoundError:
+        return None
+    if isBinarySave(data):
+        return decodeSave(data)
+    return FomodSave(json.loads(data))
+
+def hashStepData(stepData: Dict[str, object]) -> str:
+    canonical = json.dumps(stepData, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+# On Windows file can't be replaced while another process has it open, e.g. MO2 instance that reads the same save.
+WRITE_FILE_ATTEMPTS = 20
+WRITE_FILE_RETRY_DELAY = 0.01
+
+def writeFileAtomic(path: str, content: bytes) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tempPath = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tempPath, "wb") as file:
+        file.write(content)
+    for attempt in range(WRITE_FILE_ATTEMPTS):
+        try:
+            os.replace(tempPath, path)
+            return
+        except PermissionError:
+            if attempt == WRITE_FILE_ATTEMPTS - 1:
+                os.remove(tempPath)
+                raise
+            time.sleep(WRITE_FILE_RETRY_DELAY * (attempt + 1))
+
+class FileLock():
+    """
+    Advisory lock that is shared between processes, held on the first byte of the file at 'path'.
+    Not reentrant, and the file is never removed, so that every process locks the same file.
+    """
+    POLL_INTERVAL = 0.005
+
+    def __init__(self, path: str, timeout: float = 30.0):
+        self.path = path
+        self.timeout = timeout
+        self._file: Optional[BinaryIO] = None
+
+    def acquire(self, blocking: bool = True) -> bool:
+        """
+        Returns False if lock is held by another process and 'blocking' is False, raises 'TimeoutError'
+        if lock wasn't released in 'timeout' seconds.
+        """
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        file = open(self.path, "a+b")
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                if os.name == "nt":
+                    file.seek(0)
+                    msvcrt.locking(file.fileno(), msvcrt.LK_NBLCK, 1)
+                else:
+                    fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                self._file = file
+                return True
+            except OSError:
+                if not blocking or time.monotonic() >= deadline:
+                    file.close()
+                    if blocking:
+                        raise TimeoutError(f"Failed to lock '{self.path}' in {self.timeout} seconds")
+                    return False
+                time.sleep(FileLock.POLL_INTERVAL)
+
+    def release(self) -> None:
+        file = self._file
+        if not file:
+            return
+        self._file = None
+        try:
+            if os.name == "nt":
+                file.seek(0)
+                msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+        finally:
+            file.close()
+
+class ChoiceChange():
+    def __init__(self, stepTitle: str, groupTitle: str, choiceText: str, wasChecked: Optional[bool], isChecked: Optional[bool]):
+        self.stepTitle = stepTitle
+        self.groupTitle = groupTitle
+        self.choiceText = choiceText
+        # None means that choice does not exist in that save.
+        self.wasChecked = wasChecked
+        self.isChecked = isChecked
+
+    def __str__(self) -> str:
+        return f"'{self.stepTitle}' / '{self.groupTitle}' / '{self.choiceText}': {self.wasChecked} -> {self.isChecked}"
+
+def diffSaves(oldSave: FomodSave, newSave: FomodSave) -> List[ChoiceChange]:
+    """
+    Returns choices that were added, removed or checked differently in 'newSave' compared to 'oldSave'.
+    """
+    def collectChoices(save: FomodSave) -> Dict[Tuple[str, int, str, int, str, int], bool]:
+        choices: Dict[Tuple[str, int, str, int, str, int], bool] = {}
+        for step in save.steps:
+            for group in step.groups:
+                for choice in group.choices:
+                    choices[(step.title, step.widgetIndex, group.title, group.widgetIndex, choice.text, choice.widgetIndex)] = choice.isChecked
+        return choices
+
+    oldChoices = collectChoices(oldSave)
+    newChoices = collectChoices(newSave)
+    changes: List[ChoiceChange] = []
+    for key in list(oldChoices) + [key for key in newChoices if key not in oldChoices]:
+        wasChecked = oldChoices.get(key)
+        isChecked = newChoices.get(key)
+        if wasChecked != isChecked:
+            changes.append(ChoiceChange(key[0], key[2], key[4], wasChecked, isChecked))
+    return changes
+
+def isSameStepStructure(a: FomodStepSave, b: FomodStepSave) -> bool:
+    if len(a.groups) != len(b.groups):
+        return False
+    for groupA, groupB in zip(a.groups, b.groups):
+        if groupA.title != groupB.title or groupA.widgetIndex != groupB.widgetIndex or len(groupA.choices) != len(groupB.choices):
+            return False
+        for choiceA, choiceB in zip(groupA.choices, groupB.choices):
+            if choiceA.text != choiceB.text or choiceA.widgetIndex != choiceB.widgetIndex:
+                return False
+    return True
+
+class SaveVersion():
+    def __init__(self, index: int, time: float):
+        # 0 is the latest version, 1 is the one installed before it, and so on.
+        self.index = index
+        self.time = time
+
+class SaveStoreStatistics():
+    def __init__(self):
+        self.numSaves = 0
+        self.numLegacySaves = 0
+        self.numStepRefs = 0
+        self.numUniqueSteps = 0
+        # Size the saves would take if every one was written as a full JSON file, like before deduplication.
+        self.logicalBytes = 0
+        self.physicalBytes = 0
+        # Size on disk after saves that aren't deduplicated yet are converted.
+        self.deduplicatedBytes = 0
+
+    def __str__(self) -> str:
+        savedBytes = self.logicalBytes - self.deduplicatedBytes
+        savedPercent = savedBytes * 100 / self.logicalBytes if self.logicalBytes else 0
+        return (
+            f"{self.numSaves} saves ({self.numLegacySaves} not deduplicated yet), "
+            f"{self.numStepRefs} step references to {self.numUniqueSteps} unique steps, "
+            f"{self.logicalBytes} bytes as full saves, {self.physicalBytes} bytes on disk, "
+            f"{self.deduplicatedBytes} bytes when deduplicated, saves {savedBytes} bytes ({savedPercent:.1f}%)"
+        )
+
+def withStoreLock(method: Callable) -> Callable:
+    @functools.wraps(method)
+    def wrapper(self: "SaveStore", *args, **kwargs):
+        with self.exclusive():
+            return method(self, *args, **kwargs)
+    return wrapper
+
+class PendingSave():
+    """
+    Latest state of a save that was changed by journal entries which are not applied to save files yet.
+    'save' is None if save was removed, then old save is still used unless 'legacySaveRemoved' is set.
+    """
+    def __init__(self, save: Optional[FomodSave], modTime: Optional[float], legacySaveRemoved: bool):
+        self.save = save
+        self.modTime = modTime
+        self.legacySaveRemoved = legacySaveRemoved
+
+class SaveStore():
+    """
+    Saves of a single game: each mod has a record that lists hashes of its steps, steps are stored once per unique content.
+    Keeps up to 'historySize' previous versions of every save, and can be shared between processes via 'journalFolder'.
+    """
+    REFCOUNTS_FILE_NAME = "refcounts.json"
+    JOURNAL_FILE_NAME = "journal.ndjson"
+    JOURNAL_LOCK_FILE_NAME = "journal.lock"
+    # Journal starts with a fixed-size header that is rewritten in place: '{"generation": N, "applied": M}', padded with spaces.
+    JOURNAL_HEADER_SIZE = 64
+    # Header is read again after a short delay while it is half-written.
+    JOURNAL_HEADER_READ_ATTEMPTS = 20
+    JOURNAL_HEADER_RETRY_DELAY = 0.001
+    # Journal is applied after a write when it has this many entries, or when its oldest entry is this old.
+    JOURNAL_BATCH_SIZE = 32
+    JOURNAL_MAX_DELAY = 5.0
+    # Saves loaded from files that are kept, oldest ones are dropped first.
+    CACHE_SIZE = 64
+
+    def __init__(
+        self,
+        savesFolder: str,
+        stepsFolder: str,
+        legacySavesFolder: Optional[str] = None,
+        encoding: str = SaveEncoding.BINARY,
+        historyFolder: Optional[str] = None,
+        historySize: int = 0,
+        journalFolder: Optional[str] = None,
+    ):
+        self.savesFolder = savesFolder
+        self.stepsFolder = stepsFolder
+        self.legacySavesFolder = legacySavesFolder
+        self.encoding = encoding
+        self.historyFolder = historyFolder
+        self.historySize = historySize
+        self._refCounts: Optional[Dict[str, int]] = None
+        self._batchDepth = 0
+        self._refCountsChanged = False
+        # Changes of reference counts that are not written yet, they are kept when counts are read again.
+        self._refCountDeltas: Dict[str, int] = {}
+        # Saves are changed from UI thread and from background sweep of orphaned saves.
+        self._lock = threading.RLock()
+        self.journalPath = os.path.join(journalFolder, SaveStore.JOURNAL_FILE_NAME) if journalFolder else None
+        self._fileLock = FileLock(os.path.join(journalFolder, SaveStore.JOURNAL_LOCK_FILE_NAME)) if journalFolder else None
+        self._fileLockDepth = 0
+        # What this instance has read from the journal. Saves loaded from files are cached until generation changes.
+        self._viewLock = threading.Lock()
+        self._journalGeneration = -1
+        self._journalOffset = 0
+        self._journalEntryCount = 0
+        self._journalFirstEntryTime: Optional[float] = None
+        self._pendingSaves: Dict[str, PendingSave] = {}
+        self._cache: Dict[str, Optional[FomodSave]] = {}
+
+    @staticmethod
+    def fromPluginDataPath(pluginDataPath: str, gameName: str, encoding: str = SaveEncoding.BINARY, historySize: int = 0) -> "SaveStore":
+        return SaveStore(
+            getGameDataFolder(pluginDataPath, "saves_v5", gameName),
+            getGameDataFolder(pluginDataPath, "steps_v1", gameName),
+            getGameDataFolder(pluginDataPath, "saves_v3", gameName),
+            encoding,
+            getGameDataFolder(pluginDataPath, "history_v1", gameName),
+            historySize,
+            getGameDataFolder(pluginDataPath, "journal_v1", gameName),
+        )
+
+    @staticmethod
+    def fromOrganizer(organizer: mobase.IOrganizer, encoding: str = SaveEncoding.BINARY, historySize: int = 0) -> "SaveStore":
+        return SaveStore.fromPluginDataPath(organizer.pluginDataPath(), organizer.managedGame().gameName(), encoding, historySize)
+
+    def savePath(self, modName: str) -> str:
+        return os.path.join(self.savesFolder, modName + ".json")
+
+    def legacySavePath(self, modName: str) -> Optional[str]:
+        if not self.legacySavesFolder:
+            return None
+        return os.path.join(self.legacySavesFolder, escapeFileName(modName) + ".json")
+
+    def stepPath(self, stepHash: str) -> str:
+        extension = ".json" if self.encoding == SaveEncoding.JSON else ".bin"
+        return os.path.join(self.stepsFolder, stepHash[:2], stepHash + extension)
+
+    def _stepPaths(self, stepHash: str) -> List[str]:
+        return [os.path.join(self.stepsFolder, stepHash[:2], stepHash + extension) for extension in (".bin", ".json")]
+
+    def historyPath(self, modName: str) -> Optional[str]:
+        if not self.historyFolder:
+            return None
+        return os.path.join(self.historyFolder, modName + ".json")
+
+    def modNames(self) -> List[str]:
+        return list(self.iterModNames())
+
+    def iterModNames(self) -> Iterator[str]:
+        pendingSaves = dict(self._refreshJournal())
+        for modName in self._iterFileModNames():
+            if modName not in pendingSaves:
+                yield modName
+        for modName, pending in pendingSaves.items():
+            if pending.save is not None:
+                yield modName
+
+    def _iterFileModNames(self) -> Iterator[str]:
+        for root, _, files in os.walk(self.savesFolder):
+            for file in files:
+                if file.endswith(".json"):
+                    modName, _ = os.path.splitext(os.path.relpath(os.path.join(root, file), self.savesFolder))
+                    yield modName
+
+    def iterLegacyFileNames(self) -> Iterator[str]:
+        """
+        Yields file names of saves in older format without extension, journal is not included.
+        """
+        if not self.legacySavesFolder:
+            return
+        for path in getFilePathsInFolder(self.legacySavesFolder, ".json"):
+            fileName, _ = os.path.splitext(os.path.relpath(path, self.legacySavesFolder))
+            yield fileName
+
+    def iterLegacyOnlyFileNames(self, modNames: Optional[Iterable[str]] = None) -> Iterator[str]:
+        """
+        Yields file names of old saves except those that have a newer save of the mod with the same escaped name,
+        which is read instead. 'modNames' are names of saves in the store, if they are already listed.
+        """
+        escapedModNames = {escapeFileName(modName) for modName in (self.iterModNames() if modNames is None else modNames)}
+        for fileName in self.iterLegacyFileNames():
+            if fileName not in escapedModNames:
+                yield fileName
+
+    def loadLegacy(self, fileName: str) -> Optional[FomodSave]:
+        if not self.legacySavesFolder:
+            return None
+        data = self._readJson(os.path.join(self.legacySavesFolder, fileName + ".json"))
+        return FomodSave(data) if isinstance(data, dict) else None
+
+    def legacySaveTime(self, fileName: str) -> Optional[float]:
+        if not self.legacySavesFolder:
+            return None
+        try:
+            return os.path.getmtime(os.path.join(self.legacySavesFolder, fileName + ".json"))
+        except FileNotFoundError:
+            return None
+
+    @withStoreLock
+    def writeLegacy(self, fileName: str, save: FomodSave, modTime: float) -> None:
+        """
+        Writes save in older format, for saves that are known only by escaped file name of their mod.
+        """
+        if not self.legacySavesFolder or escapeFileName(fileName) != fileName:
+            raise ValueError(f"Invalid old save file name '{fileName}'")
+        path = os.path.join(self.legacySavesFolder, fileName + ".json")
+        writeFileAtomic(path, json.dumps(save.toDict(), indent=4).encode("utf-8"))
+        os.utime(path, (modTime, modTime))
+        # Mod names of this file are not known, saves of every mod could be read from it.
+        with self._viewLock:
+            self._cache.clear()
+
+    def load(self, modName: str) -> Optional[FomodSave]:
+        """
+        Returns the latest save, never waits for writers. Returned save may be shared with other callers
+        and must not be modified.
+        """
+        pending = self._refreshJournal().get(modName)
+        if pending:
+            if pending.save is not None or pending.legacySaveRemoved:
+                return pending.save
+            return self._loadFile(modName, recordRemoved=True)
+
+        if not self.journalPath:
+            return self._loadFile(modName)
+        generation = self._journalGeneration
+        if modName in self._cache:
+            return self._cache[modName]
+        save = self._loadFile(modName)
+        with self._viewLock:
+            if generation == self._journalGeneration:
+                if len(self._cache) >= SaveStore.CACHE_SIZE:
+                    del self._cache[next(iter(self._cache))]
+                self._cache[modName] = save
+        return save
+
+    def cachedSaveCount(self) -> int:
+        return len(self._cache)
+
+    def _loadFile(self, modName: str, recordRemoved: bool = False) -> Optional[FomodSave]:
+        for savePath in (None if recordRemoved else self.savePath(modName), self.legacySavePath(modName)):
+            if not savePath:
+                continue
+            logDebug(f"Checking save file at path '{savePath}'")
+            data = self._readJson(savePath)
+            if data is None:
+                continue
+            if isinstance(data, dict):
+                return self._loadRecord(data)
+            break
+        return None
+
+    @withStoreLock
+    def write(self, modName: str, save: FomodSave, modTime: Optional[float] = None) -> None:
+        """
+        Writes 'save' as the latest version. 'modTime' overrides modification time of the save,
+        so that imported saves keep the time they were made at.
+        """
+        if not self.journalPath:
+            self._applyWrite(modName, save, modTime)
+            return
+        self._appendJournal({"op": "write", "mod": modName, "time": modTime if modTime is not None else time.time(), "save": save.toDict()})
+
+    @withStoreLock
+    def remove(self, modName: str, removeLegacySave: bool = True) -> bool:
+        if not self.journalPath:
+            return self._applyRemove(modName, removeLegacySave)
+        hasRecord, hasLegacySave = self._saveExists(modName)
+        historyPath = self.historyPath(modName)
+        if not hasRecord and not (removeLegacySave and hasLegacySave) and not (historyPath and os.path.exists(historyPath)):
+            return False
+        self._appendJournal({"op": "remove", "mod": modName, "legacy": removeLegacySave})
+        return True
+
+    @withStoreLock
+    def rename(self, oldName: str, newName: str) -> bool:
+        if not self.journalPath:
+            return self._applyRename(oldName, newName)
+        hasRecord, hasLegacySave = self._saveExists(oldName)
+        if (not hasRecord and not hasLegacySave) or self.savePath(oldName) == self.savePath(newName):
+            return False
+        save = self.load(oldName)
+        modTime = self.saveTime(oldName)
+        if not save or modTime is None:
+            logCritical(f"Not renaming save of '{oldName}' to '{newName}', failed to read it")
+            return False
+        # Entry has the save, so that readers don't depend on whether old save was already moved.
+        self._appendJournal({"op": "rename", "old": oldName, "new": newName, "fromLegacy": not hasRecord, "time": modTime, "save": save.toDict()})
+        return True
+
+    @contextmanager
+    def exclusive(self, blocking: bool = True) -> Iterator[bool]:
+        """
+        Holds the lock that threads and other processes take to change saves, yields False if 'blocking'
+        is False and the lock is held by someone else. Also used for changes made outside of the store.
+        """
+        if not self._lock.acquire(blocking):
+            yield False
+            return
+        try:
+            if self._fileLock and self._fileLockDepth == 0 and not self._fileLock.acquire(blocking):
+                yield False
+                return
+            self._fileLockDepth += 1
+            try:
+                yield True
+            finally:
+                self._fileLockDepth -= 1
+                if self._fileLock and self._fileLockDepth == 0:
+                    self._fileLock.release()
+        finally:
+            self._lock.release()
+
+    def flush(self, blocking: bool = True) -> bool:
+        """
+        Applies all journal entries to save files. Returns False if 'blocking' is False and another writer holds the lock.
+        """
+        with self.exclusive(blocking) as acquired:
+            if acquired:
+                self._applyJournal()
+            return acquired
+
+    def _applyWrite(self, modName: str, save: FomodSave, modTime: Optional[float] = None) -> None:
+        self._loadRefCounts()
+        stepRefs = [self._storeStep(step) for step in save.steps]
+        addedRefs = list(stepRefs)
+
+        path = self.savePath(modName)
+        removedRefs = self._readStepRefs(path)
+        if self.historySize > 0:
+            previousSave = self._loadFile(modName)
+            previousTime = self._fileSaveTime(modName)
+            if previousSave and previousTime is not None and previousSave.toDict() != save.toDict():
+                historyAddedRefs, historyRemovedRefs = self._pushHistory(modName, save, previousSave, previousTime)
+                addedRefs += historyAddedRefs
+                removedRefs += historyRemovedRefs
+
+        writeFileAtomic(path, json.dumps({"steps": [], "stepRefs": stepRefs}).encode("utf-8"))
+        if modTime is not None:
+            os.utime(path, (modTime, modTime))
+        self._updateRefCounts(addedRefs, removedRefs)
+
+        # Remove save in older format.
+        if legacyPath := self.legacySavePath(modName):
+            try:
+                os.remove(legacyPath)
+            except FileNotFoundError:
+                pass
+
+    def _applyRemove(self, modName: str, removeLegacySave: bool = True) -> bool:
+        self._loadRefCounts()
+        removed = False
+        path = self.savePath(modName)
+        oldStepRefs = self._readStepRefs(path) + self._readHistoryStepRefs(modName)
+        for savePath in (path, self.legacySavePath(modName) if removeLegacySave else None, self.historyPath(modName)):
+            if not savePath:
+                continue
+            try:
+                os.remove(savePath)
+                removed = True
+            except FileNotFoundError:
+                pass
+        self._updateRefCounts([], oldStepRefs)
+        return removed
+
+    def _applyRename(self, oldName: str, newName: str) -> bool:
+        self._loadRefCounts()
+        newSavePath = self.savePath(newName)
+        for oldSavePath in (self.savePath(oldName), self.legacySavePath(oldName)):
+            if not oldSavePath or not os.path.exists(oldSavePath):
+                continue
+            if oldSavePath == newSavePath:
+                return False
+
+            overwrittenStepRefs = self._readStepRefs(newSavePath) + self._readHistoryStepRefs(newName)
+            for path in (newSavePath, self.historyPath(newName)):
+                try:
+                    if path:
+                        os.remove(path)
+                except FileNotFoundError:
+                    pass
+            os.makedirs(os.path.dirname(newSavePath), exist_ok=True)
+            os.rename(oldSavePath, newSavePath)
+
+            oldHistoryPath = self.historyPath(oldName)
+            newHistoryPath = self.historyPath(newName)
+            if oldHistoryPath and newHistoryPath and os.path.exists(oldHistoryPath):
+                os.makedirs(os.path.dirname(newHistoryPath), exist_ok=True)
+                os.rename(oldHistoryPath, newHistoryPath)
+
+            self._updateRefCounts([], overwrittenStepRefs)
+            logDebug(f"Renamed save file '{oldSavePath}' to '{newSavePath}'")
+            return True
+        return False
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """
+        Writes reference counts once after all changes made inside 'with' block, instead of after every change.
+        """
+        with self._lock:
+            self._batchDepth += 1
+            try:
+                yield
+            finally:
+                self._batchDepth -= 1
+                if self._batchDepth == 0 and self._refCountsChanged:
+                    self._writeRefCounts()
+
+    def listVersions(self, modName: str) -> List[SaveVersion]:
+        latestTime = self.saveTime(modName)
+        if latestTime is None:
+            return []
+        if not self.applyPendingHistory(modName):
+            return [SaveVersion(0, latestTime)]
+        versions = [SaveVersion(0, latestTime)]
+        for index, entry in enumerate(self._readHistory(modName)):
+            versions.append(SaveVersion(index + 1, float(cast(float, entry["time"]))))
+        return versions
+
+    def loadVersion(self, modName: str, index: int) -> Optional[FomodSave]:
+        """
+        Returns version 'index' of the save, as numbered by 'listVersions'.
+        """
+        save = self.load(modName)
+        if index == 0 or not save:
+            return save
+        if not self.applyPendingHistory(modName):
+            return None
+
+        save = self._loadFile(modName)
+        if not save:
+            return None
+        history = self._readHistory(modName)
+        if index > len(history):
+            return None
+        for entry in history[:index]:
+            save = self._applyDelta(save, cast(List[list], entry["delta"]))
+        return save
+
+    def loadVersions(self, modName: str, readOnly: bool = False) -> List[Tuple[SaveVersion, FomodSave]]:
+        """
+        Returns every version as numbered by 'listVersions' together with its save. If 'readOnly' is set, journal
+        is never applied, and only the latest version is returned while journal has changes of this save.
+        """
+        save = self.load(modName)
+        latestTime = self.saveTime(modName)
+        if not save or latestTime is None:
+            return []
+        versions = [(SaveVersion(0, latestTime), save)]
+        if readOnly and modName in self._refreshJournal():
+            return versions
+        if not self.applyPendingHistory(modName):
+            return versions
+
+        olderSave = self._loadFile(modName)
+        if not olderSave:
+            return versions
+        for index, entry in enumerate(self._readHistory(modName)):
+            olderSave = self._applyDelta(olderSave, cast(List[list], entry["delta"]))
+            versions.append((SaveVersion(index + 1, float(cast(float, entry["time"]))), olderSave))
+        return versions
+
+    def restoreVersion(self, modName: str, index: int) -> bool:
+        """
+        Makes version 'index' the latest one, current latest version goes to history.
+        """
+        save = self.loadVersion(modName, index)
+        if not save:
+            return False
+        self.write(modName, save)
+        return True
+
+    @withStoreLock
+    def insertVersion(self, modName: str, save: FomodSave, modTime: float) -> bool:
+        """
+        Adds 'save' made at 'modTime' to history of an existing save, among versions by time.
+        Returns False if it's not older than the latest version, is already kept, or history has no place for it.
+        """
+        latestTime = self.saveTime(modName)
+        if self.historySize <= 0 or latestTime is None or modTime >= latestTime:
+            return False
+        self._applyJournal()
+        latestSave = self._loadFile(modName)
+        if not latestSave:
+            return False
+
+        history = self._readHistory(modName)
+        versions = [latestSave]
+        for entry in history:
+            versions.append(self._applyDelta(versions[-1], cast(List[list], entry["delta"])))
+        saveData = save.toDict()
+        if any(version.toDict() == saveData for version in versions):
+            return False
+        index = next((index for index, entry in enumerate(history) if float(cast(float, entry["time"])) < modTime), len(history))
+        if index >= self.historySize:
+            return False
+
+        # Entries are deltas from the next newer version, entries before the inserted one stay the same.
+        self._loadRefCounts()
+        newEntry, addedRefs = self._makeHistoryEntry(versions[index], save, modTime)
+        newHistory = history[:index] + [newEntry]
+        if index < len(history):
+            nextEntry, nextAddedRefs = self._makeHistoryEntry(save, versions[index + 1], float(cast(float, history[index]["time"])))
+            newHistory += [nextEntry] + history[index + 1:]
+            addedRefs += nextAddedRefs
+        removedRefs = [op[1] for op in cast(List[list], history[index]["delta"]) if op[0] == "ref"] if index < len(history) else []
+        removedRefs += self._writeHistory(modName, newHistory)
+        self._updateRefCounts(addedRefs, removedRefs)
+        return True
+
+    def deduplicate(self) -> int:
+        """
+        Rewrites saves that still contain full steps into records with step references.
+        """
+        self.flush()
+        numConverted = 0
+        for modName in self.modNames():
+            data = self._readJson(self.savePath(modName))
+            if isinstance(data, dict) and "stepRefs" not in data:
+                self.write(modName, FomodSave(data))
+                numConverted += 1
+        return numConverted
+
+    def statistics(self) -> SaveStoreStatistics:
+        self.flush()
+        stats = SaveStoreStatistics()
+        for stepPath in getFilePathsInFolder(self.stepsFolder, ""):
+            stats.physicalBytes += os.path.getsize(stepPath)
+            if os.path.basename(stepPath) != SaveStore.REFCOUNTS_FILE_NAME:
+                stats.numUniqueSteps += 1
+        stats.deduplicatedBytes = stats.physicalBytes
+        pendingStepHashes: Set[str] = set()
+
+        for modName in self.modNames():
+            path = self.savePath(modName)
+            data = self._readJson(path)
+            if not isinstance(data, dict):
+                continue
+            stats.numSaves += 1
+            stats.physicalBytes += os.path.getsize(path)
+            stats.logicalBytes += len(json.dumps(self._loadRecord(data).toDict(), indent=4).encode("utf-8"))
+            if "stepRefs" in data:
+                stats.numStepRefs += len(cast(List[str], data["stepRefs"]))
+                stats.deduplicatedBytes += os.path.getsize(path)
+                continue
+
+            stats.numLegacySaves += 1
+            stepRefs: List[str] = []
+            for step in FomodSave(data).steps:
+                stepData = step.toDict()
+                stepHash = hashStepData(stepData)
+                if stepHash not in pendingStepHashes and not any(os.path.exists(path) for path in self._stepPaths(stepHash)):
+                    pendingStepHashes.add(stepHash)
+                    stats.numUniqueSteps += 1
+                    stats.deduplicatedBytes += len(self._encodeStep(step, stepData))
+                stepRefs.append(stepHash)
+            stats.numStepRefs += len(stepRefs)
+            stats.deduplicatedBytes += len(json.dumps({"steps": [], "stepRefs": stepRefs}).encode("utf-8"))
+        return stats
+
+    def _readJson(self, path: str) -> Optional[object]:
+        try:
+            with open(path, "r") as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return None
+        except json.JSONDecodeError as e:
+            logCritical(f"Failed to decode JSON for file '{path}': '{e.msg}'")
+            return None
+
+    def saveTime(self, modName: str) -> Optional[float]:
+        pending = self._refreshJournal().get(modName)
+        if pending:
+            if pending.save is not None or pending.legacySaveRemoved:
+                return pending.modTime
+            return self._fileSaveTime(modName, recordRemoved=True)
+        return self._fileSaveTime(modName)
+
+    def _fileSaveTime(self, modName: str, recordRemoved: bool = False) -> Optional[float]:
+        for savePath in (None if recordRemoved else self.savePath(modName), self.legacySavePath(modName)):
+            if savePath and os.path.exists(savePath):
+                return os.path.getmtime(savePath)
+        return None
+
+    def _storeStep(self, step: FomodStepSave) -> str:
+        stepData = step.toDict()
+        stepHash = hashStepData(stepData)
+        if not any(os.path.exists(stepPath) for stepPath in self._stepPaths(stepHash)):
+            writeFileAtomic(self.stepPath(stepHash), self._encodeStep(step, stepData))
+        return stepHash
+
+    def _readHistory(self, modName: str) -> List[Dict[str, object]]:
+        historyPath = self.historyPath(modName)
+        if not historyPath:
+            return []
+        data = self._readJson(historyPath)
+        if isinstance(data, dict) and isinstance(data.get("versions"), list):
+            return cast(List[Dict[str, object]], data["versions"])
+        return []
+
+    def _readHistoryStepRefs(self, modName: str) -> List[str]:
+        stepRefs: List[str] = []
+        for entry in self._readHistory(modName):
+            stepRefs += [op[1] for op in cast(List[list], entry["delta"]) if op[0] == "ref"]
+        return stepRefs
+
+    def _pushHistory(self, modName: str, newerSave: FomodSave, olderSave: FomodSave, olderTime: float) -> Tuple[List[str], List[str]]:
+        """
+        Adds 'olderSave' to history as delta from 'newerSave', returns added and removed step references.
+        """
+        entry, addedRefs = self._makeHistoryEntry(newerSave, olderSave, olderTime)
+        history = self._readHistory(modName)
+        history.insert(0, entry)
+        removedRefs = self._writeHistory(modName, history)
+        return addedRefs, removedRefs
+
+    def _makeHistoryEntry(self, newerSave: FomodSave, olderSave: FomodSave, olderTime: float) -> Tuple[Dict[str, object], List[str]]:
+        delta: List[list] = []
+        addedRefs: List[str] = []
+        newerStepIndices = {(step.title, step.widgetIndex): index for index, step in enumerate(newerSave.steps)}
+        for olderStep in olderSave.steps:
+            newerIndex = newerStepIndices.get((olderStep.title, olderStep.widgetIndex))
+            newerStep = newerSave.steps[newerIndex] if newerIndex is not None else None
+            if newerStep and isSameStepStructure(olderStep, newerStep):
+                toggled = [
+                    [groupIndex, choiceIndex]
+                    for groupIndex, (olderGroup, newerGroup) in enumerate(zip(olderStep.groups, newerStep.groups))
+                    for choiceIndex, (olderChoice, newerChoice) in enumerate(zip(olderGroup.choices, newerGroup.choices))
+                    if olderChoice.isChecked != newerChoice.isChecked
+                ]
+                delta.append(["toggle", newerIndex, toggled] if toggled else ["same", newerIndex])
+            else:
+                stepHash = self._storeStep(olderStep)
+                addedRefs.append(stepHash)
+                delta.append(["ref", stepHash])
+        return {"time": olderTime, "delta": delta}, addedRefs
+
+    def _writeHistory(self, modName: str, history: List[Dict[str, object]]) -> List[str]:
+        """
+        Writes up to 'historySize' newest entries of 'history', returns step references of entries that didn't fit.
+        """
+        removedRefs = [op[1] for entry in history[self.historySize:] for op in cast(List[list], entry["delta"]) if op[0] == "ref"]
+        del history[self.historySize:]
+        writeFileAtomic(cast(str, self.historyPath(modName)), json.dumps({"versions": history}).encode("utf-8"))
+        return removedRefs
+
+    def _applyDelta(self, newerSave: FomodSave, delta: List[list]) -> FomodSave:
+        olderSave = FomodSave()
+        for op in delta:
+            if op[0] == "same":
+                olderSave.steps.append(newerSave.steps[op[1]])
+            elif op[0] == "toggle":
+                step = FomodStepSave(newerSave.steps[op[1]].toDict())
+                for groupIndex, choiceIndex in op[2]:
+                    choice = step.groups[groupIndex].choices[choiceIndex]
+                    choice.isChecked = not choice.isChecked
+                olderSave.steps.append(step)
+            elif op[0] == "ref":
+                if refStep := self._readStep(op[1]):
+                    olderSave.steps.append(refStep)
+                else:
+                    logCritical(f"Step '{op[1]}' is missing from '{self.stepsFolder}', its choices won't be shown")
+        return olderSave
+
+    def _readStepRefs(self, savePath: str) -> List[str]:
+        data = self._readJson(savePath)
+        if isinstance(data, dict) and isinstance(data.get("stepRefs"), list):
+            return cast(List[str], data["stepRefs"])
+        return []
+
+    def _loadRecord(self, data: Dict[str, object]) -> FomodSave:
+        if "stepRefs" not in data:
+            return FomodSave(data)
+
+        save = FomodSave()
+        for stepHash in cast(List[str], data["stepRefs"]):
+            if step := self._readStep(stepHash):
+                save.steps.append(step)
+            else:
+                logCritical(f"Step '{stepHash}' is missing from '{self.stepsFolder}', its choices won't be shown")
+        return save
+
+    def _readStep(self, stepHash: str) -> Optional[FomodStepSave]:
+        for stepPath in self._stepPaths(stepHash):
+            try:
+                save = readSaveFile(stepPath)
+            except (SaveDecodeError, ValueError, KeyError) as e:
+                logCritical(f"Failed to decode step '{stepPath}': {e}")
+                continue
+            if save and len(save.steps) == 1:
+                return save.steps[0]
+        return None
+
+    def _encodeStep(self, step: FomodStepSave, stepData: Dict[str, object]) -> bytes:
+        if self.encoding == SaveEncoding.JSON:
+            return json.dumps({"steps": [stepData]}, sort_keys=True, separators=(",", ":")).encode("utf-8")
+        stepSave = FomodSave()
+        stepSave.steps.append(step)
+        return encodeSave(stepSave, compress=self.encoding == SaveEncoding.BINARY_ZLIB)
+
+    def _loadRefCounts(self) -> Dict[str, int]:
+        if self._refCounts is not None:
+            return self._refCounts
+
+        data = self._readJson(os.path.join(self.stepsFolder, SaveStore.REFCOUNTS_FILE_NAME))
+        if isinstance(data, dict):
+            self._refCounts = cast(Dict[str, int], data)
+        else:
+            self._refCounts = self._countStepRefs()
+        return self._refCounts
+
+    def _countStepRefs(self) -> Dict[str, int]:
+        refCounts: Dict[str, int] = {}
+        for modName in self._iterFileModNames():
+            for stepHash in self._readStepRefs(self.savePath(modName)) + self._readHistoryStepRefs(modName):
+                refCounts[stepHash] = refCounts.get(stepHash, 0) + 1
+        return refCounts
+
+    def _updateRefCounts(self, addedRefs: List[str], removedRefs: List[str]) -> None:
+        if not addedRefs and not removedRefs:
+            return
+
+        refCounts = self._loadRefCounts()
+        for stepHash in addedRefs:
+            refCounts[stepHash] = refCounts.get(stepHash, 0) + 1
+            self._refCountDeltas[stepHash] = self._refCountDeltas.get(stepHash, 0) + 1
+        for stepHash in removedRefs:
+            self._refCountDeltas[stepHash] = self._refCountDeltas.get(stepHash, 0) - 1
+            refCount = refCounts.get(stepHash, 0) - 1
+            if refCount > 0:
+                refCounts[stepHash] = refCount
+                continue
+            refCounts.pop(stepHash, None)
+            for stepPath in self._stepPaths(stepHash):
+                try:
+                    os.remove(stepPath)
+                except FileNotFoundError:
+                    pass
+            try:
+                os.rmdir(os.path.dirname(self.stepPath(stepHash)))
+            except OSError:
+                # Folder still has other steps.
+                pass
+
+        self._refCountsChanged = True
+        if self._batchDepth == 0:
+            self._writeRefCounts()
+
+    @withStoreLock
+    def recountStepRefs(self) -> None:
+        """
+        Counts step references from records and history again, e.g. after records were removed outside of the store.
+        """
+        self._refCounts = self._countStepRefs()
+        self._writeRefCounts()
+
+    def _writeRefCounts(self) -> None:
+        writeFileAtomic(
+            os.path.join(self.stepsFolder, SaveStore.REFCOUNTS_FILE_NAME),
+            json.dumps(self._loadRefCounts(), sort_keys=True).encode("utf-8"),
+        )
+        self._refCountsChanged = False
+        self._refCountDeltas = {}
+
+    def _reloadRefCounts(self) -> None:
+        """
+        Reads reference counts that other processes have written, changes of this store that are not written yet are kept.
+        """
+        deltas = self._refCountDeltas
+        self._refCounts = None
+        self._refCountDeltas = {}
+        data = self._readJson(os.path.join(self.stepsFolder, SaveStore.REFCOUNTS_FILE_NAME))
+        if not isinstance(data, dict):
+            # Counted from save files, they already have the changes.
+            self._loadRefCounts()
+            return
+        refCounts = cast(Dict[str, int], data)
+        for stepHash, delta in deltas.items():
+            refCount = refCounts.get(stepHash, 0) + delta
+            if refCount > 0:
+                refCounts[stepHash] = refCount
+            else:
+                refCounts.pop(stepHash, None)
+        self._refCounts = refCounts
+
+    def _saveExists(self, modName: str) -> Tuple[bool, bool]:
+        """
+        Returns whether mod has a save record and whether it has a save in older format, journal included.
+        """
+        pending = self._refreshJournal().get(modName)
+        legacyPath = self.legacySavePath(modName)
+        hasLegacySave = bool(legacyPath) and os.path.exists(cast(str, legacyPath)) and not (pending and pending.legacySaveRemoved)
+        hasRecord = pending.save is not None if pending else os.path.exists(self.savePath(modName))
+        return hasRecord, hasLegacySave
+
+    def applyPendingHistory(self, modName: str) -> bool:
+        """
+        History files don't include journal entries, applies them if they change this save.
+        Returns False if they couldn't be applied without waiting for another writer.
+        """
+        return modName not in self._refreshJournal() or self.flush(blocking=False)
+
+    @staticmethod
+    def _makeJournalHeader(generation: int, numApplied: int) -> bytes:
+        header = json.dumps({"generation": generation, "applied": numApplied}).encode("utf-8")
+        return header.ljust(SaveStore.JOURNAL_HEADER_SIZE - 1) + b"\n"
+
+    @staticmethod
+    def _parseJournalHeader(header: bytes) -> Optional[Tuple[int, int]]:
+        try:
+            data = json.loads(header)
+            return int(data["generation"]), int(data["applied"])
+        except (ValueError, KeyError, TypeError):
+            return None
+
+    def _parseJournalEntry(self, line: bytes) -> Optional[Dict[str, object]]:
+        if not line.strip():
+            return None
+        try:
+            entry = json.loads(line)
+        except ValueError as e:
+            logCritical(f"Skipping corrupted entry in journal '{self.journalPath}': {e}")
+            return None
+        return entry if isinstance(entry, dict) else None
+
+    def _refreshJournal(self) -> Dict[str, PendingSave]:
+        """
+        Reads journal entries that were added since the last call, returns saves changed by entries
+        in the current generation.
+        """
+        if not self.journalPath:
+            return self._pendingSaves
+
+        with self._viewLock:
+            # Header is rewritten in place, so it can be read while it is half-written.
+            for attempt in range(SaveStore.JOURNAL_HEADER_READ_ATTEMPTS):
+                try:
+                    with open(self.journalPath, "rb") as file:
+                        header = self._parseJournalHeader(file.read(SaveStore.JOURNAL_HEADER_SIZE))
+                        if header:
+                            # Journal shrinks before its header changes, see '_applyJournal'.
+                            if header[0] != self._journalGeneration or os.fstat(file.fileno()).st_size < self._journalOffset:
+                                self._resetJournalView(header[0])
+                            file.seek(self._journalOffset)
+                            data = file.read()
+                            break
+                except FileNotFoundError:
+                    if self._journalGeneration != -1:
+                        self._resetJournalView(-1)
+                    return self._pendingSaves
+                # Journal is closed while waiting, so that the writer can replace it.
+                time.sleep(SaveStore.JOURNAL_HEADER_RETRY_DELAY * (attempt + 1))
+            else:
+                logCritical(f"Failed to read journal header from '{self.journalPath}' after {SaveStore.JOURNAL_HEADER_READ_ATTEMPTS} attempts")
+                return self._pendingSaves
+
+            # Last line may still be being written.
+            end = data.rfind(b"\n") + 1
+            for line in data[:end].splitlines():
+                if entry := self._parseJournalEntry(line):
+                    self._replayJournalEntry(entry)
+            self._journalOffset += end
+            return self._pendingSaves
+
+    def _resetJournalView(self, generation: int) -> None:
+        self._journalGeneration = generation
+        self._journalOffset = SaveStore.JOURNAL_HEADER_SIZE
+        self._journalEntryCount = 0
+        self._journalFirstEntryTime = None
+        self._pendingSaves = {}
+        self._cache = {}
+
+    def _replayJournalEntry(self, entry: Dict[str, object]) -> None:
+        self._journalEntryCount += 1
+        if self._journalFirstEntryTime is None:
+            self._journalFirstEntryTime = float(cast(float, entry["logged"]))
+
+        def legacySaveRemoved(modName: str) -> bool:
+            pending = self._pendingSaves.get(modName)
+            return bool(pending and pending.legacySaveRemoved)
+
+        op = entry["op"]
+        if op == "write":
+            modName = str(entry["mod"])
+            self._pendingSaves[modName] = PendingSave(FomodSave(cast(Dict[str, object], entry["save"])), float(cast(float, entry["time"])), True)
+        elif op == "remove":
+            modName = str(entry["mod"])
+            self._pendingSaves[modName] = PendingSave(None, None, bool(entry["legacy"]) or legacySaveRemoved(modName))
+        elif op == "rename":
+            oldName = str(entry["old"])
+            newName = str(entry["new"])
+            self._pendingSaves[newName] = PendingSave(FomodSave(cast(Dict[str, object], entry["save"])), float(cast(float, entry["time"])), legacySaveRemoved(newName))
+            self._pendingSaves[oldName] = PendingSave(None, None, bool(entry["fromLegacy"]) or legacySaveRemoved(oldName))
+
+    def _appendJournal(self, entry: Dict[str, object]) -> None:
+        """
+        Must be called with store lock held.
+        """
+        journalPath = cast(str, self.journalPath)
+        if not os.path.exists(journalPath):
+            writeFileAtomic(journalPath, self._makeJournalHeader(max(0, self._journalGeneration + 1), 0))
+
+        entry["logged"] = time.time()
+        with open(journalPath, "ab") as file:
+            file.write(json.dumps(entry, ensure_ascii=False).encode("utf-8") + b"\n")
+            file.flush()
+            os.fsync(file.fileno())
+
+        self._refreshJournal()
+        firstEntryTime = self._journalFirstEntryTime
+        if self._journalEntryCount >= SaveStore.JOURNAL_BATCH_SIZE or (firstEntryTime is not None and time.time() - firstEntryTime >= SaveStore.JOURNAL_MAX_DELAY):
+            self._applyJournal()
+
+    def _applyJournal(self) -> None:
+        """
+        Applies journal entries to save files and starts the next journal generation. Must be called with store lock held.
+        """
+        if not self.journalPath:
+            return
+        try:
+            with open(self.journalPath, "rb") as file:
+                data = file.read()
+        except FileNotFoundError:
+            return
+        header = self._parseJournalHeader(data[:SaveStore.JOURNAL_HEADER_SIZE])
+        if not header:
+            logCritical(f"Not applying journal '{self.journalPath}', its header is corrupted")
+            return
+        generation, numApplied = header
+        lines = [line for line in data[SaveStore.JOURNAL_HEADER_SIZE:data.rfind(b"\n") + 1].splitlines() if line.strip()]
+        if not lines:
+            return
+
+        # Other processes change reference counts too.
+        self._reloadRefCounts()
+        self._batchDepth += 1
+        try:
+            with open(self.journalPath, "r+b") as journal:
+                for index, line in enumerate(lines[numApplied:], numApplied):
+                    if entry := self._parseJournalEntry(line):
+                        self._applyJournalEntry(entry)
+                    # Applied entries are skipped if process dies before journal is reset, renames can't be applied twice.
+                    journal.seek(0)
+                    journal.write(self._makeJournalHeader(generation, index + 1))
+                    journal.flush()
+            if numApplied > 0:
+                logInfo(f"Finished applying journal '{self.journalPath}' that was interrupted, counting step references again")
+                self._refCounts = self._countStepRefs()
+                self._refCountsChanged = True
+        finally:
+            self._batchDepth -= 1
+            if self._refCountsChanged:
+                self._writeRefCounts()
+
+        # Readers that see the old header without entries read save files that already have them.
+        with open(self.journalPath, "r+b") as journal:
+            journal.truncate(SaveStore.JOURNAL_HEADER_SIZE)
+            journal.seek(0)
+            journal.write(self._makeJournalHeader(generation + 1, 0))
+            journal.flush()
+            os.fsync(journal.fileno())
+        self._refreshJournal()
+        logDebug(f"Applied {len(lines) - numApplied} journal entries to saves")
+
+    def _applyJournalEntry(self, entry: Dict[str, object]) -> None:
+        op = entry.get("op")
+        if op == "write":
+            self._applyWrite(str(entry["mod"]), FomodSave(cast(Dict[str, object], entry["save"])), float(cast(float, entry["time"])))
+        elif op == "remove":
+            self._applyRemove(str(entry["mod"]), bool(entry["legacy"]))
+        elif op == "rename":
+            self._applyRename(str(entry["old"]), str(entry["new"]))
+        else:
+            logCritical(f"Skipping unknown journal entry '{op}'")
+
+class SaveTransferFormat():
+    NDJSON = "ndjson"
+    ARCHIVE = "zip"
+
+    ALL = (NDJSON, ARCHIVE)
+
+    @staticmethod
+    def fromPath(path: str) -> str:
+        return SaveTransferFormat.ARCHIVE if path.lower().endswith(".zip") else SaveTransferFormat.NDJSON
+
+class ImportConflictRule():
+    # Keeps save that was modified later, like 'migrateSaves' does.
+    NEWEST_WINS = "newest_wins"
+    # Keeps save that was modified later, the other one becomes its previous version in history.
+    # Same as NEWEST_WINS if history is disabled and for saves in older format, which have no history.
+    KEEP_BOTH = "keep_both"
+    OVERWRITE = "overwrite"
+    SKIP = "skip"
+
+    ALL = (NEWEST_WINS, KEEP_BOTH, OVERWRITE, SKIP)
+
+class SaveTransferStatistics():
+    def __init__(self):
+        self.numSaves = 0
+        self.numSkipped = 0
+        self.numLegacySaves = 0
+        self.numVersions = 0
+        self.numBytes = 0
+        self.seconds = 0.0
+
+    def __str__(self) -> str:
+        seconds = max(self.seconds, 1e-9)
+        return (
+            f"{self.numSaves} saves ({self.numLegacySaves} in old format, {self.numSkipped} skipped, {self.numVersions} kept as previous versions), "
+            f"{self.numBytes} bytes in {self.seconds:.2f}s, "
+            f"{(self.numSaves + self.numSkipped) / seconds:.0f} saves/s, {self.numBytes / seconds / 1024 / 1024:.2f} MiB/s"
+        )
+
+# Exported saves are a stream of records: {"mod": mod name, "time": modification time, "save": 'FomodSave.toDict()'}.
+# Saves in older format are known only by escaped mod name: {"kind": "legacy", "file": file name, "time": ..., "save": ...}.
+# NDJSON export has one record per line after a header line, archive has one record per "saves/<index>.json" entry.
+SAVE_TRANSFER_HEADER = {"format": "remember_installation_choices", "version": 2}
+
+def iterExportRecords(store: SaveStore) -> Iterator[Dict[str, object]]:
+    # Old saves are read from files, journal may remove them.
+    store.flush()
+    for modName in store.iterModNames():
+        modTime = store.saveTime(modName)
+        save = store.load(modName)
+        if save is None or modTime is None:
+            continue
+        yield {"mod": modName, "time": modTime, "save": save.toDict()}
+
+    for fileName in store.iterLegacyOnlyFileNames():
+        modTime = store.legacySaveTime(fileName)
+        save = store.loadLegacy(fileName)
+        if save is None or modTime is None:
+            continue
+        yield {"kind": "legacy", "file": fileName, "time": modTime, "save": save.toDict()}
+
+def exportSaves(store: SaveStore, path: str, format: Optional[str] = None) -> SaveTransferStatistics:
+    """
+    Streams every save in 'store' into file at 'path', only one save is held in memory at a time.
+    """
+    stats = SaveTransferStatistics()
+    start = time.perf_counter()
+    format = format or SaveTransferFormat.fromPath(path)
+    records = iterExportRecords(store)
+    if format == SaveTransferFormat.ARCHIVE:
+        with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr("header.json", json.dumps(SAVE_TRANSFER_HEADER))
+            for index, record in enumerate(records):
+                data = json.dumps(record, ensure_ascii=False).encode("utf-8")
+                archive.writestr(f"saves/{index}.json", data)
+                stats.numSaves += 1
+                if record.get("kind") == "legacy":
+                    stats.numLegacySaves += 1
+                stats.numBytes += len(data)
+    else:
+        with open(path, "wb") as file:
+            file.write(json.dumps(SAVE_TRANSFER_HEADER).encode("utf-8") + b"\n")
+            for record in records:
+                data = json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n"
+                file.write(data)
+                stats.numSaves += 1
+                if record.get("kind") == "legacy":
+                    stats.numLegacySaves += 1
+                stats.numBytes += len(data)
+    stats.seconds = time.perf_counter() - start
+    return stats
+
+def iterImportRecords(path: str, format: Optional[str] = None) -> Iterator[Tuple[Dict[str, object], int]]:
+    """
+    Yields records from file made by 'exportSaves' together with their size in bytes.
+    """
+    def checkHeader(header: object) -> None:
+        if not isinstance(header, dict) or header.get("format") != SAVE_TRANSFER_HEADER["format"]:
+            raise ValueError(f"'{path}' is not an export of saves")
+        if cast(int, header.get("version", 0)) > cast(int, SAVE_TRANSFER_HEADER["version"]):
+            raise ValueError(f"'{path}' was exported by newer version of the plugin")
+
+    format = format or SaveTransferFormat.fromPath(path)
+    if format == SaveTransferFormat.ARCHIVE:
+        with zipfile.ZipFile(path, "r") as archive:
+            checkHeader(json.loads(archive.read("header.json")))
+            for info in archive.infolist():
+                if info.filename.startswith("saves/"):
+                    data = archive.read(info)
+                    yield json.loads(data), len(data)
+    else:
+        with open(path, "rb") as file:
+            checkHeader(json.loads(file.readline()))
+            for line in file:
+                if line.strip():
+                    yield json.loads(line), len(line)
+
+def importSaves(store: SaveStore, path: str, conflictRule: str = ImportConflictRule.NEWEST_WINS, format: Optional[str] = None) -> SaveTransferStatistics:
+    """
+    Streams saves from file made by 'exportSaves' into 'store', resolving saves that already exist with 'conflictRule'.
+    """
+    stats = SaveTransferStatistics()
+    start = time.perf_counter()
+    with store.batch():
+        importRecords(store, iterImportRecords(path, format), conflictRule, stats)
+    stats.seconds = time.perf_counter() - start
+    return stats
+
+def importRecords(store: SaveStore, records: Iterable[Tuple[Dict[str, object], int]], conflictRule: str, stats: SaveTransferStatistics) -> None:
+    for record, size in records:
+        stats.numBytes += size
+        if record.get("kind") == "legacy":
+            importLegacyRecord(store, record, conflictRule, stats)
+            continue
+        modName = str(record["mod"])
+        modTime = float(cast(float, record["time"]))
+        save = FomodSave(cast(Dict[str, object], record["save"]))
+
+        existingTime = store.saveTime(modName)
+        if existingTime is not None and conflictRule != ImportConflictRule.OVERWRITE:
+            if conflictRule == ImportConflictRule.SKIP:
+                stats.numSkipped += 1
+                continue
+            if conflictRule == ImportConflictRule.KEEP_BOTH:
+                # Saves that were imported before are not imported again.
+                if (existingSave := store.load(modName)) and existingSave.toDict() == save.toDict():
+                    stats.numSkipped += 1
+                    continue
+                if existingTime >= modTime:
+                    if store.insertVersion(modName, save, modTime):
+                        stats.numVersions += 1
+                    else:
+                        stats.numSkipped += 1
+                    continue
+                # Existing save goes to history when newer save is written.
+                if store.historySize > 0:
+                    stats.numVersions += 1
+            elif existingTime >= modTime:
+                stats.numSkipped += 1
+                continue
+
+        store.write(modName, save, modTime)
+        stats.numSaves += 1
+
+def importLegacyRecord(store: SaveStore, record: Dict[str, object], conflictRule: str, stats: SaveTransferStatistics) -> None:
+    fileName = str(record["file"])
+    modTime = float(cast(float, record["time"]))
+    existingTime = store.legacySaveTime(fileName)
+    if existingTime is not None and conflictRule != ImportConflictRule.OVERWRITE:
+        if conflictRule == ImportConflictRule.SKIP or existingTime >= modTime:
+            stats.numSkipped += 1
+            return
+    store.writeLegacy(fileName, FomodSave(cast(Dict[str, object], record["save"])), modTime)
+    stats.numSaves += 1
+    stats.numLegacySaves += 1
+
+class SweepAction():
+    OFF = "off"
+    # Only logs orphaned saves.
+    REPORT = "report"
+    # Moves orphaned saves into quarantine folder of the sweeper as full JSON saves.
+    QUARANTINE = "quarantine"
+    DELETE = "delete"
+
+    ALL = (OFF, REPORT, QUARANTINE, DELETE)
+
+class SweepReport():
+    def __init__(self, action: str):
+        self.action = action
+        # Mod names from saves folder that have no mod in any MO2 instance that sweeps them.
+        self.orphanedSaves: List[str] = []
+        # File names from legacy saves folder that have no mod.
+        self.orphanedLegacySaves: List[str] = []
+        # File names from legacy saves folder that also have a save in the current format.
+        self.leftoverLegacySaves: List[str] = []
+        # Saves that have no mod, but other MO2 instances didn't check them yet.
+        self.numUnconfirmed = 0
+        # MO2 instances that didn't sweep for a long time, nothing is removed until they sweep again or expire.
+        self.staleInstances: List[str] = []
+        self.numChecked = 0
+        self.numUnchanged = 0
+        self.numRemoved = 0
+        self.quarantineFolder: Optional[str] = None
+
+    def __str__(self) -> str:
+        text = (
+            f"{len(self.orphanedSaves)} orphaned saves, {len(self.orphanedLegacySaves)} orphaned old saves, "
+            f"{len(self.leftoverLegacySaves)} old saves that have newer saves, "
+            f"{self.numUnconfirmed} saves without mods that other MO2 instances didn't check yet; "
+            f"checked {self.numChecked}, skipped {self.numUnchanged} unchanged since last sweep, "
+            f"action '{self.action}' removed {self.numRemoved}"
+        )
+        if self.staleInstances:
+            text += f", not removing until MO2 instances sweep again: {', '.join(self.staleInstances)}"
+        if self.quarantineFolder:
+            text += f", moved to '{self.quarantineFolder}'"
+        return text
+
+class SweptInstance():
+    def __init__(self, mods: Set[str], sweepTime: float):
+        self.mods = mods
+        # When 'mods' were read.
+        self.sweepTime = sweepTime
+
+class SaveSweeper():
+    """
+    Finds saves of mods that no longer exist in MO2 instances sharing the saves, and old saves that were superseded.
+    """
+    BATCH_SIZE = 50
+    # Instance with the same mods is written to state again only after this long, so that sweeps that find nothing new don't write.
+    INSTANCE_REFRESH_AGE = 24 * 60 * 60
+    # Nothing is removed while an instance didn't sweep for this long, its mods are likely out of date.
+    INSTANCE_FRESH_AGE = 30 * 24 * 60 * 60
+    # Instance that didn't sweep for this long is forgotten, e.g. its MO2 folder was deleted.
+    INSTANCE_EXPIRY_AGE = 180 * 24 * 60 * 60
+    # Folders changed this recently are listed again by the next sweep, a write in the same second may not change their time.
+    FOLDER_TIME_PRECISION = 2.0
+
+    def __init__(self, store: SaveStore, folder: str, statistics: Optional["ChoiceStatistics"] = None):
+        self.store = store
+        self.folder = folder
+        self.statePath = os.path.join(folder, "state.json")
+        self.statistics = statistics
+
+    @staticmethod
+    def instanceKey(modsPath: str) -> str:
+        return os.path.normcase(os.path.abspath(modsPath))
+
+    def sweep(self, instance: str, modNames: Iterable[str], action: str) -> SweepReport:
+        """
+        Sweeps saves with mods of 'instance' (see 'instanceKey'). Save is orphaned once every known instance
+        has swept after the save was first seen and has no mod for it.
+        """
+        report = SweepReport(action)
+        instanceMods = set(modNames)
+        if not instanceMods:
+            # Most likely mod list failed to load, every save would look orphaned.
+            logCritical("Not sweeping orphaned saves: no mods were found")
+            return report
+
+        now = time.time()
+        # Sweep checks save files, they have to include changes that are still in the journal.
+        self.store.flush()
+        # State is shared with other instances, they can sweep at the same time.
+        with self.store.exclusive():
+            state = self._readState()
+            instances = self._readInstances(state)
+            previousMods: Set[str] = set().union(*(entry.mods for entry in instances.values()))
+            expiredInstances = self._expireInstances(instances, instance, now)
+            instanceEntry = instances.get(instance)
+            if not instanceEntry or instanceEntry.mods != instanceMods:
+                instanceEntry = SweptInstance(instanceMods, now)
+                instances[instance] = instanceEntry
+                self._writeState(dict(state, instances=self._instancesToState(instances)))
+            elif expiredInstances:
+                self._writeState(dict(state, instances=self._instancesToState(instances)))
+        mods: Set[str] = set().union(*(entry.mods for entry in instances.values()))
+        removedMods = previousMods - mods
+        report.staleInstances = sorted(key for key, entry in instances.items() if now - entry.sweepTime > SaveSweeper.INSTANCE_FRESH_AGE)
+        # Saves first seen after this were not checked by every other instance yet.
+        othersSweepTime = min((entry.sweepTime for key, entry in instances.items() if key != instance), default=now)
+
+        previousSaves = self._readSaveTimes(state, "saves")
+        saves, folders = self._listFolder(
+            self.store.savesFolder, {modName: times[0] for modName, times in previousSaves.items()}, cast(Dict[str, float], state.get("folders", {})), now)
+        # Modification time and when that version of the save was first seen by a sweep, imported saves can have old modification times.
+        saveTimes = {modName: (modTime, self._seenTime(previousSaves.get(modName), modTime, now)) for modName, modTime in saves.items()}
+        previousOrphans = set(cast(List[str], state.get("orphans", [])))
+        # Saves without mods, orphaned or not yet.
+        orphans: List[str] = []
+        for modName, (modTime, seenTime) in saveTimes.items():
+            if self._isUnchanged(previousSaves, modName, modTime) and modName not in removedMods and modName not in previousOrphans:
+                report.numUnchanged += 1
+                continue
+            report.numChecked += 1
+            if modName in mods:
+                continue
+            orphans.append(modName)
+            if seenTime <= othersSweepTime:
+                report.orphanedSaves.append(modName)
+            else:
+                report.numUnconfirmed += 1
+
+        legacySaveTimes: Dict[str, Tuple[float, float]] = {}
+        legacyFolders: Dict[str, float] = {}
+        legacyOrphans: List[str] = []
+        if self.store.legacySavesFolder:
+            previousLegacySaves = self._readSaveTimes(state, "legacySaves")
+            legacySaves, legacyFolders = self._listFolder(
+                self.store.legacySavesFolder, {fileName: times[0] for fileName, times in previousLegacySaves.items()},
+                cast(Dict[str, float], state.get("legacyFolders", {})), now)
+            legacySaveTimes = {fileName: (modTime, self._seenTime(previousLegacySaves.get(fileName), modTime, now)) for fileName, modTime in legacySaves.items()}
+            previousLegacyOrphans = set(cast(List[str], state.get("legacyOrphans", [])))
+            previousLeftovers = set(cast(List[str], state.get("leftovers", [])))
+            escapedSaveNames = {escapeFileName(modName) for modName in saves}
+            # Old saves used escaped mod names, so several mods can share one old save file name.
+            modsByEscapedName: Dict[str, List[str]] = {}
+            for modName in mods:
+                modsByEscapedName.setdefault(escapeFileName(modName), []).append(modName)
+            changedNames = {escapeFileName(modName) for modName, modTime in saves.items() if not self._isUnchanged(previousSaves, modName, modTime)}
+            changedNames.update(escapeFileName(modName) for modName in removedMods)
+            for fileName, (modTime, seenTime) in legacySaveTimes.items():
+                if self._isUnchanged(previousLegacySaves, fileName, modTime) and fileName not in changedNames and fileName not in previousLegacyOrphans and fileName not in previousLeftovers:
+                    report.numUnchanged += 1
+                    continue
+                report.numChecked += 1
+                owners = modsByEscapedName.get(fileName, [])
+                if fileName in escapedSaveNames and all(modName in saves for modName in owners):
+                    report.leftoverLegacySaves.append(fileName)
+                elif not owners:
+                    legacyOrphans.append(fileName)
+                    if seenTime <= othersSweepTime:
+                        report.orphanedLegacySaves.append(fileName)
+                    else:
+                        report.numUnconfirmed += 1
+
+        if action in (SweepAction.QUARANTINE, SweepAction.DELETE) and not report.staleInstances:
+            self._removeSaves(report, instance, mods, saveTimes, legacySaveTimes, now)
+
+        # Entry with the same mods is written again only when other instances need its time to find orphaned saves.
+        unconfirmedTimes = [saveTimes[modName][1] for modName in orphans if modName in saveTimes]
+        unconfirmedTimes += [legacySaveTimes[fileName][1] for fileName in legacyOrphans if fileName in legacySaveTimes]
+        if now - instanceEntry.sweepTime > SaveSweeper.INSTANCE_REFRESH_AGE or any(seenTime > instanceEntry.sweepTime for seenTime in unconfirmedTimes):
+            instanceEntry = SweptInstance(instanceMods, now)
+        with self.store.exclusive():
+            state = self._readState()
+            instances = self._readInstances(state)
+            self._expireInstances(instances, instance, now)
+            instances[instance] = instanceEntry
+            newState = {
+                "instances": self._instancesToState(instances),
+                "saves": {modName: list(times) for modName, times in saveTimes.items()},
+                "folders": folders,
+                "legacySaves": {fileName: list(times) for fileName, times in legacySaveTimes.items()},
+                "legacyFolders": legacyFolders,
+                # Saves without mods are checked again next time, even if they didn't change.
+                "orphans": sorted(modName for modName in orphans if modName in saveTimes),
+                "legacyOrphans": sorted(fileName for fileName in legacyOrphans if fileName in legacySaveTimes),
+                "leftovers": sorted(fileName for fileName in report.leftoverLegacySaves if fileName in legacySaveTimes),
+            }
+            if newState != state:
+                self._writeState(newState)
+        return report
+
+    def _removeSaves(
+        self,
+        report: SweepReport,
+        instance: str,
+        mods: Set[str],
+        saveTimes: Dict[str, Tuple[float, float]],
+        legacySaveTimes: Dict[str, Tuple[float, float]],
+        now: float,
+    ) -> None:
+        quarantineFolder: Optional[str] = None
+        if report.action == SweepAction.QUARANTINE and (report.orphanedSaves or report.orphanedLegacySaves or report.leftoverLegacySaves):
+            quarantineFolder = os.path.join(self.folder, "quarantine", time.strftime("%Y%m%d-%H%M%S"))
+            report.quarantineFolder = quarantineFolder
+
+        # Instances and mod names from state, read again for every batch.
+        instances: Dict[str, SweptInstance] = {}
+        newNames: Set[str] = set()
+
+        orphanedLegacySaves = set(report.orphanedLegacySaves)
+
+        def isStillOrphaned(name: str, modTime: Optional[float], times: Tuple[float, float], checkSeenTime: bool) -> bool:
+            # Another instance could have swept with its mods since this sweep started.
+            if name in newNames:
+                logInfo(f"Not removing save '{name}', its mod was found in another MO2 instance")
+                return False
+            if checkSeenTime and any(key != instance and entry.sweepTime < times[1] for key, entry in instances.items()):
+                logInfo(f"Not removing save '{name}', another MO2 instance didn't check it yet")
+                return False
+            if modTime != times[0]:
+                logInfo(f"Not removing save '{name}', it was changed since it was checked")
+                return False
+            return True
+
+        def removeLegacySave(fileName: str) -> None:
+            assert self.store.legacySavesFolder
+            # Old saves that have newer saves are removed regardless of instances, newer saves have their choices.
+            isOrphaned = fileName in orphanedLegacySaves
+            if not isStillOrphaned(fileName, self.store.legacySaveTime(fileName), legacySaveTimes[fileName], isOrphaned):
+                return
+            path = os.path.join(self.store.legacySavesFolder, fileName + ".json")
+            # Old saves that have newer saves are not counted in statistics.
+            save = self.store.loadLegacy(fileName) if self.statistics and isOrphaned else None
+            if quarantineFolder:
+                newPath = os.path.join(quarantineFolder, "saves_v3", fileName + ".json")
+                os.makedirs(os.path.dirname(newPath), exist_ok=True)
+                shutil.move(path, newPath)
+            else:
+                os.remove(path)
+            legacySaveTimes.pop(fileName, None)
+            report.numRemoved += 1
+            if self.statistics and save:
+                self.statistics.removeLegacySave(fileName, save)
+
+        def removeSave(modName: str) -> None:
+            if not isStillOrphaned(modName, self.store.saveTime(modName), saveTimes[modName], True):
+                return
+            save = self.store.load(modName)
+            if quarantineFolder and save:
+                path = os.path.join(quarantineFolder, "saves_v4", modName + ".json")
+                writeFileAtomic(path, json.dumps(save.toDict(), indent=4).encode("utf-8"))
+            # Old save with the same escaped name may belong to another mod, old saves are checked separately.
+            self.store.remove(modName, removeLegacySave=False)
+            saveTimes.pop(modName, None)
+            report.numRemoved += 1
+            if self.statistics:
+                self.statistics.replaceSave(modName, save, None)
+
+        tasks: List[Tuple[Callable[[str], None], str]] = [(removeLegacySave, fileName) for fileName in report.orphanedLegacySaves + report.leftoverLegacySaves]
+        tasks += [(removeSave, modName) for modName in report.orphanedSaves]
+        for batchStart in range(0, len(tasks), SaveSweeper.BATCH_SIZE):
+            with self.store.exclusive(), self.store.batch():
+                instances = self._readInstances(self._readState())
+                self._expireInstances(instances, None, now)
+                newMods = set().union(*(entry.mods for entry in instances.values())) - mods
+                newNames = newMods | {escapeFileName(modName) for modName in newMods}
+                for removeFunc, name in tasks[batchStart:batchStart + SaveSweeper.BATCH_SIZE]:
+                    try:
+                        removeFunc(name)
+                    except OSError as e:
+                        logCritical(f"Failed to remove orphaned save '{name}': {e}")
+
+    def _listFolder(self, folder: str, previousFiles: Dict[str, float], previousFolders: Dict[str, float], now: float) -> Tuple[Dict[str, float], Dict[str, float]]:
+        """
+        Returns modification times of saves and of folders with saves. Saves are replaced when written, which changes
+        time of their folder, so saves of folders with unchanged time are taken from 'previousFiles' without listing.
+        """
+        previousFilesByFolder: Dict[str, Dict[str, float]] = {}
+        for name, fileTime in previousFiles.items():
+            previousFilesByFolder.setdefault(os.path.dirname(name), {})[name] = fileTime
+        files: Dict[str, float] = {}
+        folders: Dict[str, float] = {}
+        pending = [""]
+        while pending:
+            subfolder = pending.pop()
+            path = os.path.join(folder, subfolder)
+            try:
+                folderTime = os.path.getmtime(path)
+                if previousFolders.get(subfolder) == folderTime:
+                    folders[subfolder] = folderTime
+                    files.update(previousFilesByFolder.get(subfolder, {}))
+                    pending.extend(name for name in previousFolders if name and os.path.dirname(name) == subfolder)
+                    continue
+                if now - folderTime > SaveSweeper.FOLDER_TIME_PRECISION:
+                    folders[subfolder] = folderTime
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        name = os.path.join(subfolder, entry.name)
+                        if entry.is_dir():
+                            pending.append(name)
+                        elif entry.name.endswith(".json"):
+                            try:
+                                files[os.path.splitext(name)[0]] = entry.stat().st_mtime
+                            except FileNotFoundError:
+                                pass
+            except FileNotFoundError:
+                pass
+        return files, folders
+
+    def _readState(self) -> Dict[str, object]:
+        try:
+            with open(self.statePath, "r") as file:
+                state = json.load(file)
+                return state if isinstance(state, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except json.JSONDecodeError as e:
+            logCritical(f"Failed to decode JSON for file '{self.statePath}': '{e.msg}', will check all saves")
+            return {}
+
+    def _writeState(self, state: Dict[str, object]) -> None:
+        writeFileAtomic(self.statePath, json.dumps(state).encode("utf-8"))
+
+    def _readInstances(self, state: Dict[str, object]) -> Dict[str, SweptInstance]:
+        instances = state.get("instances")
+        if not isinstance(instances, dict):
+            return {}
+        return {
+            instance: SweptInstance(set(entry.get("mods", [])), float(entry.get("time", 0)))
+            for instance, entry in instances.items() if isinstance(entry, dict)
+        }
+
+    def _expireInstances(self, instances: Dict[str, SweptInstance], currentInstance: Optional[str], now: float) -> List[str]:
+        expired = [instance for instance, entry in instances.items() if instance != currentInstance and now - entry.sweepTime > SaveSweeper.INSTANCE_EXPIRY_AGE]
+        for instance in expired:
+            logInfo(f"Forgetting mods of MO2 instance '{instance}', it didn't sweep saves since {time.ctime(instances[instance].sweepTime)}")
+            del instances[instance]
+        return expired
+
+    def _instancesToState(self, instances: Dict[str, SweptInstance]) -> Dict[str, Dict[str, object]]:
+        return {instance: {"mods": sorted(entry.mods), "time": entry.sweepTime} for instance, entry in instances.items()}
+
+    def _readSaveTimes(self, state: Dict[str, object], key: str) -> Dict[str, Tuple[float, float]]:
+        saveTimes = state.get(key)
+        if not isinstance(saveTimes, dict):
+            return {}
+        return {name: (times[0], times[1]) for name, times in saveTimes.items() if isinstance(times, list) and len(times) == 2}
+
+    def _isUnchanged(self, previousTimes: Dict[str, Tuple[float, float]], name: str, modTime: float) -> bool:
+        return name in previousTimes and previousTimes[name][0] == modTime
+
+    def _seenTime(self, previousTimes: Optional[Tuple[float, float]], modTime: float, now: float) -> float:
+        return previousTimes[1] if previousTimes and previousTimes[0] == modTime else now
+
+def sweepSavesThread(sweeper: SaveSweeper, instance: str, modNames: Set[str], action: str) -> None:
+    try:
+        report = sweeper.sweep(instance, modNames, action)
+    except Exception as e:
+        logCritical(f"Failed to sweep orphaned saves: {e}")
+        return
+    if report.orphanedSaves or report.orphanedLegacySaves or report.leftoverLegacySaves:
+        logInfo(f"Orphaned saves sweep: {report}")
+        for modName in report.orphanedSaves:
+            logDebug(f"- orphaned save '{modName}'")
+        for fileName in report.orphanedLegacySaves + report.leftoverLegacySaves:
+            logDebug(f"- orphaned old save '{fileName}'")
+    else:
+        logDebug(f"Orphaned saves sweep: {report}")
+
+StepCounts = Dict[str, Dict[str, Dict[str, List[int]]]]
+
+class ChoiceStatisticsRebuild():
+    """
+    Counts of a rebuild that is in progress. Saves are scanned by keys: (True, mod name) for saves of the store,
+    (False, file name) for old saves that are not shadowed by a newer save.
+    """
+    def __init__(self, modNames: List[str], legacyFileNames: List[str], generation: int):
+        self.steps: StepCounts = {}
+        self.pending: Set[Tuple[bool, str]] = {(True, modName) for modName in modNames} | {(False, fileName) for fileName in legacyFileNames}
+        # Mods that have a save in the store, other mods may have an old save.
+        self.modNames = set(modNames)
+        # Generation that statistics file should have when rebuild is done, if no other instance changes it.
+        self.generation = generation
+
+class ChoiceStatistics():
+    """
+    How often every choice was picked across saves of all mods, as [times picked, times seen],
+    keyed by step title, group title and choice text.
+    """
+    # Choice is usual if it was picked in at least this many saves, and in at least this fraction of saves that had it.
+    USUAL_MIN_PICKED = 2
+    USUAL_MIN_RATIO = 0.6
+    REBUILD_BATCH_SIZE = 50
+    REBUILD_ATTEMPTS = 3
+
+    def __init__(self, path: str, store: SaveStore):
+        self.path = path
+        self.store = store
+        self._steps: Optional[StepCounts] = None
+        self._generation = 0
+        self._modTime: Optional[float] = None
+        self._lock = threading.Lock()
+        self._rebuild: Optional[ChoiceStatisticsRebuild] = None
+
+    @staticmethod
+    def isUsual(counts: List[int]) -> bool:
+        picked, seen = counts
+        return picked >= ChoiceStatistics.USUAL_MIN_PICKED and picked >= seen * ChoiceStatistics.USUAL_MIN_RATIO
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def lookup(self, stepTitle: str, groupTitle: str) -> Dict[str, List[int]]:
+        """
+        Returns counts of choices in group, by choice text.
+        """
+        with self._lock:
+            return self._load().get(stepTitle, {}).get(groupTitle, {})
+
+    def replaceSave(self, modName: str, oldSave: Optional[FomodSave], newSave: Optional[FomodSave]) -> None:
+        """
+        Replaces counts of 'oldSave' of the mod with counts of 'newSave'. Caller holds store lock since it
+        loaded 'oldSave' and until the save is changed, so that changes are counted in the same order as they are made.
+        """
+        with self.store.exclusive(), self._lock:
+            steps = self._load(reload=True)
+            if oldSave:
+                self._addSave(steps, oldSave, -1)
+            if newSave:
+                self._addSave(steps, newSave, 1)
+            self._generation += 1
+            self._write(steps)
+
+            if rebuild := self._rebuild:
+                rebuild.generation += 1
+                oldKey = (True, modName) if modName in rebuild.modNames else (False, escapeFileName(modName))
+                # Saves that were not scanned yet are counted as they are when they're scanned.
+                if oldSave and oldKey not in rebuild.pending:
+                    self._addSave(rebuild.steps, oldSave, -1)
+                if newSave and (True, modName) not in rebuild.pending:
+                    self._addSave(rebuild.steps, newSave, 1)
+                if newSave:
+                    rebuild.modNames.add(modName)
+                else:
+                    rebuild.modNames.discard(modName)
+
+    def removeLegacySave(self, fileName: str, save: FomodSave) -> None:
+        """
+        Removes counts of old save that is not shadowed by a newer save, same as 'replaceSave'.
+        """
+        with self.store.exclusive(), self._lock:
+            steps = self._load(reload=True)
+            self._addSave(steps, save, -1)
+            self._generation += 1
+            self._write(steps)
+
+            if rebuild := self._rebuild:
+                rebuild.generation += 1
+                if (False, fileName) not in rebuild.pending:
+                    self._addSave(rebuild.steps, save, -1)
+
+    def rebuild(self) -> None:
+        for attempt in range(ChoiceStatistics.REBUILD_ATTEMPTS):
+            with self.store.exclusive(), self._lock:
+                self._load(reload=True)
+                modNames = self.store.modNames()
+                rebuild = ChoiceStatisticsRebuild(modNames, list(self.store.iterLegacyOnlyFileNames(modNames)), self._generation)
+                self._rebuild = rebuild
+            try:
+                keys = sorted(rebuild.pending)
+                for batchStart in range(0, len(keys), ChoiceStatistics.REBUILD_BATCH_SIZE):
+                    with self.store.exclusive():
+                        self.store.flush()
+                        for key in keys[batchStart:batchStart + ChoiceStatistics.REBUILD_BATCH_SIZE]:
+                            isSave, name = key
+                            save = self.store.load(name) if isSave else self.store.loadLegacy(name)
+                            if save:
+                                self._addSave(rebuild.steps, save, 1)
+                            rebuild.pending.discard(key)
+
+                with self.store.exclusive(), self._lock:
+                    self._load(reload=True)
+                    if self._generation == rebuild.generation or attempt == ChoiceStatistics.REBUILD_ATTEMPTS - 1:
+                        self._steps = rebuild.steps
+                        self._generation += 1
+                        self._write(rebuild.steps)
+                        return
+                logDebug("Choice statistics were changed by another instance during rebuild, rebuilding again")
+            finally:
+                with self._lock:
+                    self._rebuild = None
+
+    def _addSave(self, steps: StepCounts, save: FomodSave, sign: int) -> None:
+        for step in save.steps:
+            groups = steps.setdefault(step.title, {})
+            for group in step.groups:
+                choices = groups.setdefault(group.title, {})
+                for choice in group.choices:
+                    counts = choices.setdefault(choice.text, [0, 0])
+                    counts[0] = max(0, counts[0] + sign * int(choice.isChecked))
+                    counts[1] = max(0, counts[1] + sign)
+                    if counts[1] == 0:
+                        del choices[choice.text]
+                if not choices:
+                    del groups[group.title]
+            if not groups:
+                del steps[step.title]
+
+    def _load(self, reload: bool = False) -> StepCounts:
+        """
+        Returns counts from statistics file, reads it again if another instance changed it. Must be called with
+        store lock held if 'reload' is set, to read file before changing it.
+        """
+        try:
+            modTime: Optional[float] = os.path.getmtime(self.path)
+        except FileNotFoundError:
+            modTime = None
+        if self._steps is not None and not reload and modTime == self._modTime:
+            return self._steps
+
+        self._steps = {}
+        self._generation = 0
+        self._modTime = modTime
+        try:
+            with open(self.path, "r") as file:
+                data = json.load(file)
+            if isinstance(data, dict) and isinstance(data.get("steps"), dict):
+                self._steps = data["steps"]
+                self._generation = int(data.get("generation", 0))
+        except FileNotFoundError:
+            pass
+        except (json.JSONDecodeError, KeyError, ValueError) as e:
+            logCritical(f"Failed to read choice statistics from '{self.path}': {e}")
+        return self._steps
+
+    def _write(self, steps: StepCounts) -> None:
+        writeFileAtomic(self.path, json.dumps({"generation": self._generation, "steps": steps}).encode("utf-8"))
+        self._modTime = os.path.getmtime(self.path)
+
+def rebuildChoiceStatisticsThread(statistics: ChoiceStatistics) -> None:
+    try:
+        statistics.rebuild()
+        logDebug(f"Rebuilt choice statistics at '{statistics.path}'")
+    except Exception as e:
+        logCritical(f"Failed to rebuild choice statistics: {e}")
+
+class SignalConnections():
+    """
+    Signal connections made by one wrapper of MO2 widget, so that all of them are disconnected when it's destroyed.
+    """
+    def __init__(self):
+        self._connections: List[Tuple[object, Callable[..., None]]] = []
+
+    def connect(self, signal, method: Callable[..., None]) -> None:
+        weakMethod = weakref.WeakMethod(method)
+        # Signal arguments that method doesn't take are dropped, e.g. 'checked' of 'clicked'.
+        numArgs = method.__func__.__code__.co_argcount - 1  # type: ignore[attr-defined]
+
+        def slot(*args) -> None:
+            boundMethod = weakMethod()
+            if boundMethod:
+                boundMethod(*args[:numArgs])
+
+        signal.connect(slot)
+        self._connections.append((signal, slot))
+
+    def disconnectAll(self) -> None:
+        for signal, slot in self._connections:
+            try:
+                signal.disconnect(slot)  # type: ignore[attr-defined]
+            except (RuntimeError, TypeError):
+                # Widget is already deleted, its connections are deleted with it.
+                pass
+        self._connections.clear()
+
 class FomodChoice():
     def __init__(self, plugin: RememberModChoicesPlugin, widget: Union[QRadioButton, QCheckBox], widgetIndex: int):
         self.plugin = plugin
         self.widget = widget
-        self.widget.toggled.connect(self._updateVisuals)
+        self._connections = SignalConnections()
+        self._connections.connect(self.widget.toggled, self._updateVisuals)
         self.widgetIndex = widgetIndex
         self.originalToolTip = self.widget.toolTip()
         self.save: Optional[FomodChoiceSave] = None
+        # Set if save was found by similar text, not exact text.
+        self.saveSimilarity: Optional[float] = None
+        # [times picked, times seen] from 'ChoiceStatistics' if this choice is usually picked in other mods.
+        self.usualChoiceCounts: Optional[List[int]] = None
+        # Set when user clicks the choice, changes made by plugin don't set it.
+        self.clickedByUser = False
+        self._connections.connect(self.widget.clicked, self._onClicked)
 
     def text(self) -> str:
         return self.widget.text()
     
     def isChecked(self) -> bool:
         return self.widget.isChecked()
+
+    def _onClicked(self) -> None:
+        self.clickedByUser = True
     
     def setChecked(self, checked: bool) -> None:
         if self.widget.isEnabled():
@@ -584,27 +3030,51 @@ class FomodChoice():
         styleSheet = self.plugin.hintChoiceStyleSheet() if self.widget.isEnabled() else self.plugin.disabledHintChoiceStyleSheet()
         self.widget.setStyleSheet(f"{self.widget.__class__.__name__} {{ {styleSheet} }}")
 
+    def _useUsualChoiceVisuals(self) -> None:
+        assert self.usualChoiceCounts
+        picked, seen = self.usualChoiceCounts
+        self.widget.setToolTip(self._makeToolTipText(f"You usually pick this choice: it was selected in {picked} of {seen} installations of other mods with this option."))
+        styleSheet = self.plugin.usualChoiceStyleSheet() if self.widget.isEnabled() else self.plugin.disabledUsualChoiceStyleSheet()
+        self.widget.setStyleSheet(f"{self.widget.__class__.__name__} {{ {styleSheet} }}")
+
+    def _useRenamedChoiceVisuals(self) -> None:
+        assert self.save
+        self.widget.setToolTip(self._makeToolTipText(f"You previously selected '{self.save.text}' when you installed this mod, this choice looks like its new name ({self.saveSimilarity:.0%} similar)."))
+        styleSheet = self.plugin.renamedChoiceStyleSheet() if self.widget.isEnabled() else self.plugin.disabledRenamedChoiceStyleSheet()
+        self.widget.setStyleSheet(f"{self.widget.__class__.__name__} {{ {styleSheet} }}")
+
     def _clearVisuals(self) -> None:
         self.widget.setToolTip(self.originalToolTip)
         self.widget.setStyleSheet(None)
 
-    def setSave(self, save: FomodChoiceSave) -> None:
+    def setSave(self, save: FomodChoiceSave, similarity: Optional[float] = None) -> None:
         self.save = save
+        self.saveSimilarity = similarity
+        self._updateVisuals()
+
+    def setUsualChoiceCounts(self, counts: List[int]) -> None:
+        self.usualChoiceCounts = counts
         self._updateVisuals()
 
     def _updateVisuals(self) -> None:
-        if self.save and self.save.isChecked and isinstance(self.widget, QRadioButton):
+        if self.save and self.save.isChecked and self.saveSimilarity is not None:
+            self._useRenamedChoiceVisuals()
+        elif self.save and self.save.isChecked and isinstance(self.widget, QRadioButton):
             self._usePreviousChoiceVisuals()
         elif self.save and self.save.isChecked != self.isChecked():
             self._useHintVisuals()
         elif self.save and self.save.isChecked:
             self._usePreviousChoiceVisuals()
+        elif not self.save and self.usualChoiceCounts:
+            self._useUsualChoiceVisuals()
         else:
             self._clearVisuals()
 
     def _destroy(self) -> None:
-        self._clearVisuals()
-        self.widget.toggled.disconnect(self._updateVisuals)
+        self._connections.disconnectAll()
+        # Choice widgets are deleted together with dialog.
+        if not sip.isdeleted(self.widget):
+            self._clearVisuals()
 
 class FomodGroup():
     def __init__(self, groupBox: QGroupBox, widgetIndex: int):
@@ -625,6 +3095,9 @@ class FomodStep():
         self.groups: List[FomodGroup] = []
         self.widgetIndex = -1
 
+    def isChangedByUser(self) -> bool:
+        return any(choice.clickedByUser for group in self.groups for choice in group.choices)
+
     def _destroy(self) -> None:
         for group in self.groups:
             group._destroy()
@@ -633,14 +3106,16 @@ class QueryOverwriteDialog():
     def __init__(self, plugin: RememberModChoicesPlugin, widget: QWidget):
         self._plugin = plugin
         self._widget = widget
-        self._widget.destroyed.connect(self._onDestroyed)
+        self._connections = SignalConnections()
+        self._connections.connect(self._widget.destroyed, self._onDestroyed)
         self._cancelButton = self._widget.findChild(QPushButton, "cancelBtn")
         if self._cancelButton:
-            self._cancelButton.clicked.connect(self._onCancelButtonClicked)
+            self._connections.connect(self._cancelButton.clicked, self._onCancelButtonClicked)
         else:
             logCritical("Failed to find cancel button in QueryOverwriteDialog.")
 
     def _onDestroyed(self) -> None:
+        self._connections.disconnectAll()
         if self._plugin.currentOverwriteDialog == self:
             self._plugin.currentOverwriteDialog = None
 
@@ -648,11 +3123,97 @@ class QueryOverwriteDialog():
         logDebug(f"Cancel button pressed in overwrite dialog, clearing pending save '{self._plugin.pendingSave}'")
         self._plugin.pendingSave = None
 
+class PrefetchedSave():
+    def __init__(self, modName: str, versions: List[SaveVersion], versionSaves: List[Optional[FomodSave]]):
+        self.modName = modName
+        # Same as 'SaveStore.listVersions', 'versionSaves[index]' is version 'index' of the save.
+        self.versions = versions
+        self.versionSaves = versionSaves
+
+    def save(self, index: int = 0) -> Optional[FomodSave]:
+        return self.versionSaves[index] if 0 <= index < len(self.versionSaves) else None
+
+class SavePrefetchedNotify(QObject): # type: ignore
+    prefetched = pyqtSignal(str)
+
+class SavePrefetcher():
+    """
+    Loads saves for mod names that installer dialog may be installed as on a worker thread, names requested last are loaded first.
+    """
+    def __init__(self, store: SaveStore):
+        self.store = store
+        # Emitted with mod name when its save is loaded, connections from UI thread are called on UI thread.
+        self.notify = SavePrefetchedNotify()
+        self._condition = threading.Condition()
+        self._requested: List[str] = []
+        self._entries: Dict[str, PrefetchedSave] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    def get(self, modName: str) -> Optional[PrefetchedSave]:
+        with self._condition:
+            return self._entries.get(modName)
+
+    def request(self, modNames: List[str]) -> None:
+        """
+        Queues names that are not loaded yet, first name is loaded first. Called on UI thread.
+        """
+        # History includes journal entries only once they are applied, worker thread doesn't write.
+        for modName in modNames:
+            try:
+                self.store.applyPendingHistory(modName)
+            except OSError as e:
+                logCritical(f"Failed to apply journal before prefetching save of '{modName}': {e}")
+        with self._condition:
+            for modName in reversed(modNames):
+                if modName in self._entries:
+                    continue
+                if modName in self._requested:
+                    self._requested.remove(modName)
+                self._requested.append(modName)
+            if not self._requested or self._closed:
+                return
+            if not self._thread:
+                self._thread = threading.Thread(target=prefetchSavesThread, args=[self], daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def close(self) -> None:
+        """
+        Lets worker thread exit, names that are still queued are not loaded.
+        """
+        with self._condition:
+            self._closed = True
+            self._requested.clear()
+            self._condition.notify()
+
+    def _load(self, modName: str) -> PrefetchedSave:
+        try:
+            versions = self.store.loadVersions(modName, readOnly=True)
+            return PrefetchedSave(modName, [version for version, _ in versions], [save for _, save in versions])
+        except Exception as e:
+            logCritical(f"Failed to prefetch save of '{modName}': {e}")
+            return PrefetchedSave(modName, [], [])
+
+def prefetchSavesThread(prefetcher: SavePrefetcher) -> None:
+    while True:
+        with prefetcher._condition:
+            while not prefetcher._requested and not prefetcher._closed:
+                prefetcher._condition.wait()
+            if prefetcher._closed:
+                return
+            modName = prefetcher._requested.pop()
+        entry = prefetcher._load(modName)
+        with prefetcher._condition:
+            prefetcher._entries[modName] = entry
+        prefetcher.notify.prefetched.emit(modName)
+
 class FomodInstallerDialog():
     def __init__(self, plugin: RememberModChoicesPlugin, widget: QWidget):
         self.plugin = plugin
         self.widget = widget
-        self.widget.destroyed.connect(self._onDestroyed)
+        self._connections = SignalConnections()
+        self._connections.connect(self.widget.destroyed, self._onDestroyed)
         self.destroyed = False
         self.installClicked = False
         self.modName = ''
@@ -661,14 +3222,26 @@ class FomodInstallerDialog():
         self.saveData: Optional[FomodSave] = None
         self.updatedSaveData: Optional[FomodSave] = None
         self.currentStep: Optional[FomodStep] = None
+        self.saveVersion = 0
+        # Widget indices of steps whose choices are not auto-selected anymore, see 'loadStepAndApplySaveState'.
+        self._settledSteps: Set[int] = set()
+        # Prefetched save of 'modName', None until it's loaded.
+        self._prefetchedSave: Optional[PrefetchedSave] = None
+        self._saveVersionCombo: Optional[QComboBox] = None
         self._nextButtonTextBeforeClick = ''
+        self._widgetTreeDumper: Optional[WidgetTreeDumper] = None
         if plugin.dumpInstallerDialogWidgetTree():
-            dumpChildrenWriteFile(self.widget)
+            self._widgetTreeDumper = WidgetTreeDumper(
+                self.widget, currentFileFolder, plugin.dumpWidgetTreeMaxDepth(), plugin.dumpWidgetTreeFilters(), plugin.dumpWidgetTreeDiff())
+            self._widgetTreeDumper.dump("Dialog opened")
+        prefetcher = plugin.savePrefetcher()
+        self._prefetcher = weakref.ref(prefetcher)
+        self._connections.connect(prefetcher.notify.prefetched, self._onSavePrefetched)
         self.loadModName()
-        self.loadSave()
         self.loadStepAndApplySaveState()
         self.installButtonHandlers()
         self.plugin.pendingSave = None
+        self.prefetchSaves()
 
     def loadModName(self) -> None:
         self._nameCombo = self.widget.findChild(QComboBox, "nameCombo")
@@ -676,10 +3249,18 @@ class FomodInstallerDialog():
             self.modName = self.widget.windowTitle()
             logCritical(f"Failed to find nameCombo, using window title as mod name: '{self.modName}'")
             return
-        self._onModNameChangedSlot = self._nameCombo.currentTextChanged.connect(self._onModNameChanged)
+        self._connections.connect(self._nameCombo.currentTextChanged, self._onModNameChanged)
         self.modName = self._nameCombo.currentText()
 
     def _onDestroyed(self) -> None:
+        # Everything is disconnected right away instead of waiting for PyQt to delete connections of deleted widgets.
+        self._connections.disconnectAll()
+        if self.currentStep:
+            self.currentStep._destroy()
+            self.currentStep = None
+        if self._widgetTreeDumper:
+            self._widgetTreeDumper.close()
+        self.plugin.closeSavePrefetcher(self._prefetcher())
         if self.plugin.currentInstallerDialog == self:
             self.plugin.currentInstallerDialog = None
 
@@ -695,28 +3276,64 @@ class FomodInstallerDialog():
         if not self.updatedSaveData:
             logDebug("FomodInstallerDialog: not saving, save data is missing")
             return
-        
-        if self._onModNameChangedSlot:
-            self._nameCombo.currentTextChanged.disconnect(self._onModNameChangedSlot)
-            self._onModNameChangedSlot = None
 
         self.plugin.pendingSave = self.updatedSaveData
 
     def _onModNameChanged(self, modName: str) -> None:
         self.modName = modName
         logDebug(f"Mod name changed: '{modName}'")
+        self.prefetchSaves()
+
+    def prefetchSaves(self) -> None:
+        """
+        Applies save of current mod name if it's already loaded, otherwise it's applied when prefetcher loads it.
+        Names from nameCombo dropdown are loaded in background too, user is likely to pick one of them.
+        """
+        modNames = [self.modName]
+        if self._nameCombo:
+            modNames += [self._nameCombo.itemText(index) for index in range(self._nameCombo.count())]
+        prefetcher = self._prefetcher()
+        if not prefetcher:
+            return
+        prefetcher.request(list(dict.fromkeys(modNames)))
+        prefetchedSave = prefetcher.get(self.modName)
+        if prefetchedSave:
+            self.applySave(prefetchedSave)
+
+    def _onSavePrefetched(self, modName: str) -> None:
+        prefetcher = self._prefetcher()
+        if self.destroyed or modName != self.modName or not prefetcher:
+            return
+        prefetchedSave = prefetcher.get(modName)
+        if prefetchedSave:
+            self.applySave(prefetchedSave)
+
+    def applySave(self, prefetchedSave: PrefetchedSave) -> None:
+        """
+        Highlights choices from prefetched save, choices are auto-selected only on steps that weren't shown
+        with a save yet and that user didn't change.
+        """
+        if prefetchedSave is self._prefetchedSave:
+            return
+        self._prefetchedSave = prefetchedSave
+        self.saveVersion = 0
+        self.saveData = prefetchedSave.save()
+        if not self.saveData:
+            logDebug(f"No save for '{prefetchedSave.modName}'")
+        self.updateSaveVersionSelector()
+        self.loadStepAndApplySaveState()
 
     def installButtonHandlers(self) -> None:
         if self.nextButton:
-            self.nextButton.pressed.connect(self._onNextButtonPressed)
-            self.nextButton.clicked.connect(self._onNextButtonClicked)
+            self._connections.connect(self.nextButton.pressed, self._onNextButtonPressed)
+            self._connections.connect(self.nextButton.clicked, self._onNextButtonClicked)
     
         for button in [self.prevButton, self.nextButton]:
             if not button:
-                logCritical(f"Failed to find prev or next button in dialog")
+                logCritical("Failed to find prev or next button in dialog")
                 continue
-            button.pressed.connect(self.updateSaveWithCurrentStep)
-            button.clicked.connect(self.loadStepAndApplySaveState)
+            self._connections.connect(button.pressed, self.updateSaveWithCurrentStep)
+            self._connections.connect(button.clicked, self.loadStepAndApplySaveState)
 
     def _onNextButtonPressed(self) -> None:
         self._nextButtonTextBeforeClick = self.nextButton.text()
@@ -724,32 +3341,60 @@ class FomodInstallerDialog():
     def _onNextButtonClicked(self) -> None:
         if self._nextButtonTextBeforeClick == QApplication.translate("FomodInstallerDialog", "Install"):
             self.installClicked = True
-            logDebug(f"onNextButtonClicked installClicked = True")
-
-    def loadSave(self) -> None:
-        if self.saveData:
+            logDebug("onNextButtonClicked installClicked = True")
+
+    def updateSaveVersionSelector(self) -> None:
+        """
+        Shows combo box next to mod name to highlight choices from one of previous installations,
+        if save of current mod name has them.
+        """
+        versions = self._prefetchedSave.versions if self._prefetchedSave else []
+        if len(versions) <= 1:
+            if self._saveVersionCombo is not None:
+                self._saveVersionCombo.hide()
             return
-        
-        for savePath in (
-            makeSavePathV4(self.plugin._organizer, self.modName),
-            makeSavePathV3(self.plugin._organizer, self.modName)
-        ):
-            logDebug(f"Checking save file at path '{savePath}'")
-            data: Optional[object] = None
-            try:
-                with open(savePath, "r") as file:
-                    data = json.load(file)
-            except FileNotFoundError:
-                logDebug(f"No save for '{self.modName}', file path: '{savePath}'")
-                continue
-            except json.JSONDecodeError as e:
-                logCritical(f"Failed to decode JSON for file '{savePath}': '{e.msg}'")
-                continue
 
-            if isinstance(data, dict):
-                self.saveData = FomodSave(data)
-                self.updatedSaveData = FomodSave()
-            break
+        # Empty combo box is falsy, it has '__len__'.
+        combo = self._saveVersionCombo if self._saveVersionCombo is not None else self.installSaveVersionSelector()
+        if combo is None:
+            return
+        # Items are replaced for another mod name, it doesn't change shown version.
+        combo.blockSignals(True)
+        combo.clear()
+        for version in versions:
+            label = "Last installation" if version.index == 0 else "Installation"
+            combo.addItem(f"{label}: {time.strftime('%Y-%m-%d %H:%M', time.localtime(version.time))}")
+            versionSave = self._prefetchedSave.save(version.index) if self._prefetchedSave and version.index > 0 else None
+            if versionSave and self.saveData:
+                numChanges = len(diffSaves(versionSave, self.saveData))
+                combo.setItemData(version.index, f"{numChanges} choices differ from last installation", Qt.ItemDataRole.ToolTipRole)
+        combo.setCurrentIndex(self.saveVersion)
+        combo.blockSignals(False)
+        combo.show()
+
+    def installSaveVersionSelector(self) -> Optional[QComboBox]:
+        if not self._nameCombo:
+            return None
+
+        parent = self._nameCombo.parentWidget()
+        layout = findLayoutContaining(parent.layout() if parent else None, self._nameCombo)
+        if not isinstance(layout, QBoxLayout):
+            logCritical("Failed to find layout with nameCombo, previous installations can't be selected")
+            return None
+
+        combo = QComboBox(self.widget)
+        combo.setObjectName("saveVersionCombo")
+        combo.setToolTip("Installation whose choices are highlighted")
+        layout.insertWidget(layout.indexOf(self._nameCombo) + 1, combo)
+        self._connections.connect(combo.currentIndexChanged, self._onSaveVersionChanged)
+        self._saveVersionCombo = combo
+        return combo
+
+    def _onSaveVersionChanged(self, index: int) -> None:
+        logDebug(f"Showing choices from save version {index}")
+        self.saveVersion = max(0, index)
+        self.saveData = self._prefetchedSave.save(self.saveVersion) if self._prefetchedSave else None
+        self.loadStepAndApplySaveState()
 
     def updateSaveWithCurrentStep(self) -> None:
         if not self.updatedSaveData:
@@ -778,24 +3423,77 @@ class FomodInstallerDialog():
         if self.installClicked:
             return
 
+        previousStep = self.currentStep
         self.loadStep()
+        # Choices are auto-selected once, when a save is applied to a step that is shown for the first time and
+        # user hasn't changed it. Saves applied later (another mod name or version, going back) only highlight choices.
+        if previousStep and (previousStep.isChangedByUser() or not self.currentStep or previousStep.widgetIndex != self.currentStep.widgetIndex):
+            self._settledSteps.add(previousStep.widgetIndex)
+        # Until save is loaded it's not known whether mod was installed before.
+        if self.currentStep and not self.saveData and self._prefetchedSave and self.plugin.showUsualChoiceHints():
+            self.applyUsualChoiceHints()
         if not self.currentStep or not self.saveData:
             return
+        autoSelect = self.plugin.autoSelectPreviousChoices() and self.currentStep.widgetIndex not in self._settledSteps
+        self._settledSteps.add(self.currentStep.widgetIndex)
 
+        # Renamed steps, groups and choices are searched only after exact matching, and not among objects that matched exactly.
+        # Choices of renamed step or group are shown as renamed too, even if their own text didn't change.
+        minSimilarity = self.plugin.renamedChoiceMinSimilarity()
+        stepSimilarity: Optional[float] = None
         saveStep = self.saveData.findStep(self.currentStep.title, self.currentStep.widgetIndex)
+        if not saveStep and minSimilarity is not None:
+            saveStep, stepSimilarity = self.saveData.findStepFuzzy(self.currentStep.title, self.currentStep.widgetIndex, minSimilarity)
+            if saveStep:
+                logDebug(f"Step '{self.currentStep.title}' matched renamed step '{saveStep.title}' ({stepSimilarity:.2f} similar)")
         if not saveStep:
             return
-        
-        for group in self.currentStep.groups:
-            saveGroup = saveStep.findGroup(group.title(), group.widgetIndex)
+
+        groups = self.currentStep.groups
+        saveGroups = [saveStep.findGroup(group.title(), group.widgetIndex) for group in groups]
+        for groupIndex, group in enumerate(groups):
+            saveGroup = saveGroups[groupIndex]
+            groupSimilarity = stepSimilarity
+            if saveGroup == None and minSimilarity is not None:
+                saveGroup, groupMatchSimilarity = saveStep.findGroupFuzzy(group.title(), group.widgetIndex, minSimilarity, saveGroups)
+                if saveGroup:
+                    logDebug(f"Group '{group.title()}' matched renamed group '{saveGroup.title}' ({groupMatchSimilarity:.2f} similar)")
+                    saveGroups[groupIndex] = saveGroup
+                    groupSimilarity = groupMatchSimilarity if groupSimilarity is None else min(groupSimilarity, groupMatchSimilarity)
             if saveGroup == None:
                 continue
 
+            saveChoices = [saveGroup.findChoice(choice.text(), choice.widgetIndex) for choice in group.choices]
+            for choiceIndex, choice in enumerate(group.choices):
+                saveChoice = saveChoices[choiceIndex]
+                similarity: Optional[float] = groupSimilarity
+                if not saveChoice and minSimilarity is not None:
+                    saveChoice, choiceSimilarity = saveGroup.findChoiceFuzzy(choice.text(), choice.widgetIndex, minSimilarity, saveChoices)
+                    saveChoices[choiceIndex] = saveChoice
+                    if saveChoice:
+                        similarity = choiceSimilarity if similarity is None else min(similarity, choiceSimilarity)
+                if not saveChoice:
+                    continue
+                choice.setSave(saveChoice, similarity)
+                # Renamed choices are only highlighted, similar text may still be a different option.
+                if autoSelect and similarity is None:
+                    choice.setChecked(saveChoice.isChecked)
+
+    def applyUsualChoiceHints(self) -> None:
+        """
+        Highlights choices that are usually picked in other mods with the same step, for mods without a save.
+        """
+        if not self.currentStep:
+            return
+        statistics = self.plugin.choiceStatistics()
+        for group in self.currentStep.groups:
+            choiceCounts = statistics.lookup(self.currentStep.title, group.title())
+            if not choiceCounts:
+                continue
             for choice in group.choices:
-                if saveChoice := saveGroup.findChoice(choice.text(), choice.widgetIndex):
-                    choice.setSave(saveChoice)
-                    if self.plugin.autoSelectPreviousChoices():
-                        choice.setChecked(saveChoice.isChecked)
+                counts = choiceCounts.get(choice.text())
+                if counts and ChoiceStatistics.isUsual(counts):
+                    choice.setUsualChoiceCounts(counts)
 
     def loadStep(self) -> None:
         if self.currentStep:
@@ -805,12 +3503,12 @@ class FomodInstallerDialog():
 
         stepsStack = self.widget.findChild(QStackedWidget, "stepsStack")
         if not stepsStack:
-            logCritical(f"Failed to find 'stepsStack' widget")
+            logCritical("Failed to find 'stepsStack' widget")
             return
         
         self.currentStep.widgetIndex = stepsStack.currentIndex()
         if self.currentStep.widgetIndex == -1:
-            logCritical(f"'stepsStack' widget must have current index, but it was -1")
+            logCritical("'stepsStack' widget must have current index, but it was -1")
         
         visibleStepWidget: Optional[QGroupBox] = None
         for stepWidget in stepsStack.children():
@@ -819,7 +3517,7 @@ class FomodInstallerDialog():
                 break
 
         if not visibleStepWidget:
-            logCritical(f"Failed to find visible step widget")
+            logCritical("Failed to find visible step widget")
             return
         
         self.currentStep.title = visibleStepWidget.title()
@@ -833,6 +3531,19 @@ class FomodInstallerDialog():
     
         if self.plugin.dumpStep():
             dumpStep(self.currentStep)
+        if self._widgetTreeDumper and self._widgetTreeDumper.diff:
+            self._widgetTreeDumper.dump(f"Step '{self.currentStep.title}'")
+
+def findLayoutContaining(layout: Optional[QLayout], widget: QWidget) -> Optional[QLayout]:
+    if not layout:
+        return None
+    if layout.indexOf(widget) != -1:
+        return layout
+    for index in range(layout.count()):
+        item = layout.itemAt(index)
+        if item and (found := findLayoutContaining(item.layout(), widget)):
+            return found
+    return None
 
 def dumpStep(step: FomodStep) -> None:
     logCritical(f"Step title: '{step.title}', widget index: {step.widgetIndex}")
@@ -841,5 +3552,144 @@ def dumpStep(step: FomodStep) -> None:
         for choice in group.choices:
             logCritical(f"- Choice: '{choice.text()}, checked: {choice.isChecked()}, widget index: {choice.widgetIndex}'")
 
-def createPlugin() -> mobase.IPlugin:
-    return RememberModChoicesPlugin()
+class SavesTransferTool(mobase.IPluginTool):
+    def __init__(self, plugin: RememberModChoicesPlugin):
+        super().__init__()
+        self._plugin = plugin
+
+    def init(self, organizer: mobase.IOrganizer):
+        return True
+
+    def author(self) -> str:
+        return self._plugin.author()
+
+    def version(self) -> mobase.VersionInfo:
+        return self._plugin.version()
+
+    def settings(self) -> List[mobase.PluginSetting]:
+        return []
+
+    def icon(self) -> QIcon:
+        return QIcon()
+
+    @abstractmethod
+    def description(self) -> str:
+        raise NotImplementedError()
+
+    def tooltip(self) -> str:
+        return self.description()
+
+    def _dialogParent(self) -> Optional[QWidget]:
+        return cast(Optional[QWidget], self._parentWidget())
+
+class ExportSavesTool(SavesTransferTool):
+    def name(self) -> str:
+        return "Remember Installation Choices Export"
+
+    def displayName(self) -> str:
+        return "Export Installation Choices"
+
+    def description(self) -> str:
+        return "Exports remembered installation choices of all mods into a file."
+
+    def display(self) -> None:
+        path, _ = QFileDialog.getSaveFileName(self._dialogParent(), self.displayName(), "", "NDJSON (*.ndjson);;Zip archive (*.zip)")
+        if not path:
+            return
+        try:
+            stats = exportSaves(self._plugin.saveStore(), path)
+        except OSError as e:
+            logCritical(f"Failed to export saves to '{path}': {e}")
+            QMessageBox.critical(self._dialogParent(), self.displayName(), f"Failed to export saves: {e}")
+            return
+        logInfo(f"Exported saves to '{path}': {stats}")
+        QMessageBox.information(self._dialogParent(), self.displayName(), f"Exported {stats}")
+
+class ImportSavesTool(SavesTransferTool):
+    CONFLICT_RULE_LABELS = {
+        ImportConflictRule.NEWEST_WINS: "Keep newer save",
+        ImportConflictRule.KEEP_BOTH: "Keep newer save, older one as previous version",
+        ImportConflictRule.OVERWRITE: "Replace existing saves",
+        ImportConflictRule.SKIP: "Keep existing saves",
+    }
+
+    def name(self) -> str:
+        return "Remember Installation Choices Import"
+
+    def displayName(self) -> str:
+        return "Import Installation Choices"
+
+    def description(self) -> str:
+        return "Imports installation choices exported with 'Export Installation Choices'."
+
+    def display(self) -> None:
+        path, _ = QFileDialog.getOpenFileName(self._dialogParent(), self.displayName(), "", "Exported choices (*.ndjson *.zip)")
+        if not path:
+            return
+        labels = list(ImportSavesTool.CONFLICT_RULE_LABELS.values())
+        label, ok = QInputDialog.getItem(self._dialogParent(), self.displayName(), "When mod already has a save:", labels, 0, False)
+        if not ok:
+            return
+        conflictRule = list(ImportSavesTool.CONFLICT_RULE_LABELS.keys())[labels.index(label)]
+        try:
+            stats = importSaves(self._plugin.saveStore(), path, conflictRule)
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile) as e:
+            logCritical(f"Failed to import saves from '{path}': {e}")
+            QMessageBox.critical(self._dialogParent(), self.displayName(), f"Failed to import saves: {e}")
+            return
+        logInfo(f"Imported saves from '{path}': {stats}")
+        # Imported saves are not in choice statistics, it is cheaper to count everything again than to diff.
+        threading.Thread(target=rebuildChoiceStatisticsThread, args=[self._plugin.choiceStatistics()], daemon=True).start()
+        QMessageBox.information(self._dialogParent(), self.displayName(), f"Imported {stats}")
+
+class InstallationStartHook(mobase.IPluginInstallerSimple):
+    """
+    Installer that never installs anything, starts loading saves as soon as MO2 starts installing an archive.
+    """
+    def __init__(self, plugin: RememberModChoicesPlugin):
+        super().__init__()
+        self._plugin = plugin
+
+    def init(self, organizer: mobase.IOrganizer):
+        return True
+
+    def name(self) -> str:
+        return "Remember Installation Choices Prefetch"
+
+    def author(self) -> str:
+        return self._plugin.author()
+
+    def description(self) -> str:
+        return "Loads saved choices of the installed mod before its installer dialog is shown."
+
+    def version(self) -> mobase.VersionInfo:
+        return self._plugin.version()
+
+    def settings(self) -> List[mobase.PluginSetting]:
+        return []
+
+    def priority(self) -> int:
+        # Other installers are asked first, this one never supports an archive anyway.
+        return -1000
+
+    def isManualInstaller(self) -> bool:
+        return False
+
+    def isArchiveSupported(self, tree: mobase.IFileTree) -> bool:
+        return False
+
+    def install(self, name: mobase.GuessedString, tree: mobase.IFileTree, version: str, nexus_id: int) -> mobase.InstallResult:
+        return mobase.InstallResult.NOT_ATTEMPTED
+
+    def onInstallationStart(self, archive: str, reinstallation: bool, current_mod: Optional[mobase.IModInterface]) -> None:
+        if not self._plugin.isActive():
+            return
+        modNames = [os.path.splitext(os.path.basename(archive))[0]]
+        if current_mod:
+            modNames.insert(0, current_mod.name())
+        logDebug(f"Installation of '{archive}' started, prefetching saves of {modNames}")
+        self._plugin.startSavePrefetcher().request(modNames)
+
+def createPlugins() -> List[mobase.IPlugin]:
+    plugin = RememberModChoicesPlugin()
+    return [plugin, ExportSavesTool(plugin), ImportSavesTool(plugin), InstallationStartHook(plugin)]
@@ -0,0 +1,89 @@
+import time
+import random
+from argparse import ArgumentParser
+from typing import List, Optional, Tuple
+
+from plugin_loader import load_plugin
+
+plugin = load_plugin()
+
+ADJECTIVES = ["Dark", "Light", "Vanilla", "Lore friendly", "Dirty", "Clean", "Snowy", "Mossy", "Rustic", "Ornate", "Worn", "Pristine"]
+NOUNS = ["Armor", "Robes", "Sword", "Shield", "Walls", "Roofs", "Banners", "Horse", "Cloak", "Helmet", "Boots", "Gloves", "Bow", "Dagger"]
+RESOLUTIONS = ["1K", "2K", "4K", "8K"]
+
+# Renames that mod authors make between versions: punctuation, case, suffixes.
+RENAMES = [
+    lambda text: text.replace(" (", " - ").replace(")", ""),
+    lambda text: text.upper(),
+    lambda text: text + " (Recommended)",
+    lambda text: text.replace(" ", "_"),
+    lambda text: text.replace("Lore friendly", "Lore-Friendly"),
+]
+
+def make_synthetic_group(rng: random.Random, num_choices: int) -> "plugin.FomodGroupSave":
+    texts = set()
+    while len(texts) < num_choices:
+        texts.add(f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} {rng.randint(1, 99)} ({rng.choice(RESOLUTIONS)})")
+    group = plugin.FomodGroupSave()
+    group.title = "Select one"
+    for index, text in enumerate(sorted(texts)):
+        choice = plugin.FomodChoiceSave()
+        choice.text = text
+        choice.widgetIndex = index
+        choice.isChecked = rng.random() < 0.3
+        group.choices.append(choice)
+    return group
+
+def match_indexed(group: "plugin.FomodGroupSave", texts: List[str], matches: List[Optional["plugin.FomodChoiceSave"]], min_similarity: float) -> None:
+    # Same lookups as 'FomodInstallerDialog.loadStepAndApplySaveState' does after exact matching.
+    for index, text in enumerate(texts):
+        if not matches[index]:
+            matches[index] = group.findChoiceFuzzy(text, index, min_similarity, matches)[0]
+
+def match_pairwise(group: "plugin.FomodGroupSave", texts: List[str], matches: List[Optional["plugin.FomodChoiceSave"]], min_similarity: float) -> None:
+    # Compares every unmatched text with every saved text, with the same similarity measure.
+    saved = [(choice, plugin.textTrigrams(choice.text)) for choice in group.choices]
+    for index, text in enumerate(texts):
+        if matches[index]:
+            continue
+        trigrams = plugin.textTrigrams(text)
+        best: Optional[Tuple[float, "plugin.FomodChoiceSave"]] = None
+        for choice, choice_trigrams in saved:
+            similarity = 2 * len(trigrams & choice_trigrams) / (len(trigrams) + len(choice_trigrams))
+            if similarity >= min_similarity and (not best or similarity > best[0]) and choice not in matches:
+                best = (similarity, choice)
+        matches[index] = best[1] if best else None
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 300, 1000])
+    parser.add_argument('--renamed', type=float, default=0.5, help='Fraction of choices that are renamed')
+    parser.add_argument('--min-similarity', type=float, default=0.8)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'choices':>8}{'renamed':>9}{'indexed, ms':>13}{'pairwise, ms':>14}{'correct':>9}{'wrong':>7}{'missed':>8}")
+    for size in args.sizes:
+        group = make_synthetic_group(rng, size)
+        texts = [choice.text for choice in group.choices]
+        renamed = rng.sample(range(size), int(size * args.renamed))
+        for index in renamed:
+            texts[index] = rng.choice(RENAMES)(texts[index])
+
+        exact = [group.findChoice(text, index) for index, text in enumerate(texts)]
+
+        # Index build time is included, it is built on first fuzzy lookup.
+        indexed = list(exact)
+        start = time.perf_counter()
+        match_indexed(group, texts, indexed, args.min_similarity)
+        indexed_time = time.perf_counter() - start
+
+        pairwise = list(exact)
+        start = time.perf_counter()
+        match_pairwise(group, texts, pairwise, args.min_similarity)
+        pairwise_time = time.perf_counter() - start
+
+        correct = sum(1 for index in renamed if indexed[index] and indexed[index].widgetIndex == index)
+        missed = sum(1 for index in renamed if not indexed[index])
+        print(f"{size:>8}{len(renamed):>9}{indexed_time * 1000:>13.1f}{pairwise_time * 1000:>14.1f}{correct:>9}{len(renamed) - correct - missed:>7}{missed:>8}")
@@ -0,0 +1,75 @@
+import json
+import time
+import random
+from argparse import ArgumentParser
+from typing import Callable, List, Tuple
+
+from plugin_loader import load_plugin
+
+plugin = load_plugin()
+
+# Texts are drawn from small pools, like real installers that reuse the same option names.
+STEP_TITLES = ["Main Files", "Textures", "Options", "Patches", "Compatibility", "Extras", "Meshes", "ENB"]
+GROUP_TITLES = ["Resolution", "Select one", "Optional files", "Patches", "Variant", "Color", "Style", "Plugins"]
+CHOICE_TEXTS = ["1K", "2K", "4K", "8K", "None", "Default", "Vanilla", "Lore friendly", "Dark", "Light",
+    "Compatibility patch for USSEP", "Compatibility patch for Requiem", "ESP-FE version", "BSA version", "Loose files"]
+
+def make_synthetic_save(rng: random.Random) -> "plugin.FomodSave":
+    save = plugin.FomodSave()
+    for step_index in range(rng.randint(1, 6)):
+        step = plugin.FomodStepSave()
+        step.title = rng.choice(STEP_TITLES)
+        step.widgetIndex = step_index
+        for group_index in range(rng.randint(1, 5)):
+            group = plugin.FomodGroupSave()
+            group.title = rng.choice(GROUP_TITLES)
+            group.widgetIndex = group_index
+            for choice_index in range(rng.randint(2, 12)):
+                choice = plugin.FomodChoiceSave()
+                choice.text = rng.choice(CHOICE_TEXTS)
+                choice.widgetIndex = choice_index + 1
+                choice.isChecked = rng.random() < 0.3
+                group.choices.append(choice)
+            step.groups.append(group)
+        save.steps.append(step)
+    return save
+
+def bench(
+    saves: List["plugin.FomodSave"],
+    encode: Callable[["plugin.FomodSave"], bytes],
+    decode: Callable[[bytes], "plugin.FomodSave"],
+) -> Tuple[float, float, int]:
+    start = time.perf_counter()
+    encoded = [encode(save) for save in saves]
+    encode_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    decoded = [decode(data) for data in encoded]
+    decode_time = time.perf_counter() - start
+
+    for save, result in zip(saves, decoded):
+        assert save.toDict() == result.toDict(), "round trip changed the save"
+    return encode_time, decode_time, sum(map(len, encoded))
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument('--saves', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    saves = [make_synthetic_save(rng) for _ in range(args.saves)]
+    print(f"Synthetic corpus: {len(saves)} saves")
+
+    formats = [
+        ("json indent=4 (current)", lambda save: json.dumps(save.toDict(), indent=4).encode("utf-8"), lambda data: plugin.FomodSave(json.loads(data))),
+        ("json compact", lambda save: json.dumps(save.toDict(), separators=(",", ":")).encode("utf-8"), lambda data: plugin.FomodSave(json.loads(data))),
+        ("binary", lambda save: plugin.encodeSave(save), plugin.decodeSave),
+        ("binary_zlib", lambda save: plugin.encodeSave(save, compress=True), plugin.decodeSave),
+    ]
+    print(f"{'format':<26}{'encode, s':>12}{'decode, s':>12}{'size, bytes':>14}{'size, %':>10}")
+    baseline_size = 0
+    for name, encode, decode in formats:
+        encode_time, decode_time, size = bench(saves, encode, decode)
+        baseline_size = baseline_size or size
+        print(f"{name:<26}{encode_time:>12.3f}{decode_time:>12.3f}{size:>14}{size * 100 / baseline_size:>10.1f}")
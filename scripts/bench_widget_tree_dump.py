@@ -0,0 +1,153 @@
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import tracemalloc
+from argparse import ArgumentParser
+from typing import Callable, Dict, List, Tuple
+
+# Dialogs are never shown on screen.
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from plugin_loader import load_plugin
+
+plugin = load_plugin()
+
+try:
+    from PyQt6.QtWidgets import QApplication, QWidget, QStackedWidget, QGroupBox, QCheckBox, QRadioButton, QPushButton, QVBoxLayout
+    from PyQt6.QtCore import QObject
+except ImportError:
+    from PyQt5.QtWidgets import QApplication, QWidget, QStackedWidget, QGroupBox, QCheckBox, QRadioButton, QPushButton, QVBoxLayout
+    from PyQt5.QtCore import QObject
+
+def dump_children_recursive(obj: QObject, root_obj: QObject) -> List[Dict[str, object]]:
+    # Dumper that the plugin used before 'WidgetTreeDumper': whole tree as nested dicts, written on UI thread.
+    root = []
+    for child in obj.children():
+        data: Dict[str, object] = {
+            "object": str(child.__class__.__name__),
+            "objectName": child.objectName(),
+        }
+        if isinstance(child, QWidget) and isinstance(root_obj, QWidget):
+            data["isVisible"] = child.isVisibleTo(root_obj)
+        if isinstance(child, (QRadioButton, QPushButton, QCheckBox)):
+            data["text"] = child.text()
+        elif isinstance(child, QGroupBox):
+            data["title"] = child.title()
+        data["children"] = dump_children_recursive(child, root_obj)
+        root.append(data)
+    return root
+
+def make_dialog(num_steps: int, num_groups: int, num_choices: int) -> Tuple[QWidget, QStackedWidget]:
+    widget = QWidget()
+    widget.setObjectName("FomodInstallerDialog")
+    steps_stack = QStackedWidget(widget)
+    steps_stack.setObjectName("stepsStack")
+    for step_index in range(num_steps):
+        step = QGroupBox(f"Step {step_index}", steps_stack)
+        step_layout = QVBoxLayout(step)
+        for group_index in range(num_groups):
+            group = QGroupBox(f"Group {group_index}", step)
+            group_layout = QVBoxLayout(group)
+            for choice_index in range(num_choices):
+                choice = QCheckBox(f"Option {choice_index}", group)
+                choice.setObjectName("choice")
+                group_layout.addWidget(choice)
+            step_layout.addWidget(group)
+        steps_stack.addWidget(step)
+    widget.show()
+    return widget, steps_stack
+
+def measure(name: str, make_run: Callable[[], Tuple[Callable[[], None], Callable[[], None]]]) -> None:
+    """
+    make_run returns (part that runs on UI thread, wait until file is written). Time and memory are measured
+    in separate runs, tracemalloc slows everything down.
+    """
+    ui_thread, finish = make_run()
+    start = time.perf_counter()
+    ui_thread()
+    ui_seconds = time.perf_counter() - start
+    finish()
+    total_seconds = time.perf_counter() - start
+
+    ui_thread, finish = make_run()
+    tracemalloc.start()
+    ui_thread()
+    finish()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<24}{ui_seconds * 1000:>10.1f}{total_seconds * 1000:>11.1f}{peak / 1024 / 1024:>11.2f}")
+
+def wait_for_dumper(dumper: "plugin.WidgetTreeDumper", label: str) -> None:
+    dumper.dump(label)
+    thread = dumper._thread
+    dumper.close()
+    if thread:
+        thread.join()
+
+def dumper_run(dumper: "plugin.WidgetTreeDumper", label: str) -> Tuple[Callable[[], None], Callable[[], None]]:
+    # UI thread only queues records, file is written by worker thread.
+    threads = []
+    def ui_thread() -> None:
+        dumper.dump(label)
+        threads.append(dumper._thread)
+        dumper.close()
+    return ui_thread, lambda: threads[0].join()
+
+# Compares dumpers of installer dialog widget tree: time spent on UI thread, total time until file is written
+# and peak traced memory, e.g.:
+#   python bench_widget_tree_dump.py --steps 20 --groups 10 --choices 30
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument('--steps', type=int, default=10)
+    parser.add_argument('--groups', type=int, default=10)
+    parser.add_argument('--choices', type=int, default=20)
+    parser.add_argument('--depth', type=int, default=2000, help='Depth of nested widgets for recursion test')
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv[:1])
+    folder = tempfile.mkdtemp(prefix="ric_dump_")
+    try:
+        widget, steps_stack = make_dialog(args.steps, args.groups, args.choices)
+        print(f"{args.steps * args.groups * args.choices} choices")
+        print(f"{'dumper':<24}{'ui, ms':>10}{'total, ms':>11}{'peak, MiB':>11}")
+
+        def recursive() -> None:
+            with open(os.path.join(folder, "recursive.json"), "w") as file:
+                json.dump(dump_children_recursive(widget, widget), file, indent=4)
+        measure("recursive", lambda: (recursive, lambda: None))
+
+        for name, options in [
+            ("streaming", {}),
+            ("streaming, depth 2", {"maxDepth": 2}),
+            ("streaming, filtered", {"filters": ["stepsStack"]}),
+        ]:
+            measure(name, lambda: dumper_run(plugin.WidgetTreeDumper(widget, folder, **options), "Dialog opened"))
+
+        def diff_run() -> Tuple[Callable[[], None], Callable[[], None]]:
+            global dumper
+            dumper = plugin.WidgetTreeDumper(widget, folder, diff=True)
+            steps_stack.setCurrentIndex(0)
+            wait_for_dumper(dumper, "Dialog opened")
+            steps_stack.setCurrentIndex(1)
+            return dumper_run(dumper, "Step 1")
+        measure("streaming, diff step", diff_run)
+        with open(dumper.diffPath, "r") as file:
+            changed = len(json.loads(file.readline())["changed"])
+        print(f"diff line has {changed} changed widgets, tree has {os.path.getsize(dumper.treePath) // 1024} KiB")
+
+        deep_root = QWidget()
+        parent = deep_root
+        for _ in range(args.depth):
+            parent = QWidget(parent)
+        try:
+            dump_children_recursive(deep_root, deep_root)
+            print(f"recursive dumper: {args.depth} nested widgets OK")
+        except RecursionError:
+            print(f"recursive dumper: RecursionError at {args.depth} nested widgets")
+        wait_for_dumper(plugin.WidgetTreeDumper(deep_root, folder), "Deep")
+        print(f"streaming dumper: {args.depth} nested widgets OK")
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
@@ -0,0 +1,79 @@
+import os
+import sys
+import random
+import shutil
+import tempfile
+from argparse import ArgumentParser
+from typing import List
+
+from plugin_loader import load_plugin
+
+plugin = load_plugin()
+plugin.logDebug = lambda s: None
+
+GAME = "Import Check"
+
+def make_save(rng: random.Random, shared_variants: int) -> "plugin.FomodSave":
+    # First step is shared with saves of other mods, second one is unique to this save.
+    shared = rng.randrange(shared_variants)
+    return plugin.FomodSave({"steps": [
+        {"title": "Textures", "widgetIndex": 0, "groups": [{"title": "Resolution", "widgetIndex": 0, "choices": [
+            {"text": f"{2 ** index}K", "widgetIndex": index, "isChecked": index == shared} for index in range(shared_variants)
+        ]}]},
+        {"title": f"Unique {rng.random()}", "widgetIndex": 1, "groups": [{"title": "Options", "widgetIndex": 0, "choices": [
+            {"text": "Option", "widgetIndex": 0, "isChecked": True},
+        ]}]},
+    ]})
+
+def check_ref_counts(store: "plugin.SaveStore") -> List[str]:
+    store.flush()
+    store._refCounts = None
+    ref_counts = store._loadRefCounts()
+    actual_ref_counts = store._countStepRefs()
+    errors = []
+    for step_hash in sorted(set(ref_counts) | set(actual_ref_counts)):
+        if ref_counts.get(step_hash) != actual_ref_counts.get(step_hash):
+            errors.append(f"step '{step_hash}': refcounts.json has {ref_counts.get(step_hash)}, saves reference it {actual_ref_counts.get(step_hash)} times")
+        if not any(os.path.exists(path) for path in store._stepPaths(step_hash)):
+            errors.append(f"step '{step_hash}' is referenced, but its file is missing")
+    return errors
+
+# Imports saves with 'keep_both' into a store that already has saves of the same mods, alternating between
+# imported saves that are newer (existing save goes to history) and older (imported save is inserted into history),
+# then removes every other mod and checks that 'refcounts.json' matches step references of saves and history
+# and that every referenced step exists, e.g.:
+#   python check_import_refcounts.py --mods 200
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument('--mods', type=int, default=100)
+    parser.add_argument('--history-size', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    data_path = tempfile.mkdtemp(prefix="ric_import_")
+    try:
+        rng = random.Random(args.seed)
+        source = plugin.SaveStore.fromPluginDataPath(os.path.join(data_path, "source"), GAME, historySize=args.history_size)
+        target = plugin.SaveStore.fromPluginDataPath(os.path.join(data_path, "target"), GAME, historySize=args.history_size)
+        for index in range(args.mods):
+            newer = index % 2 == 0
+            source.write(f"mod {index}", make_save(rng, 4), 2000 if newer else 1000)
+            target.write(f"mod {index}", make_save(rng, 4), 1500)
+        export_path = os.path.join(data_path, "saves.ndjson")
+        plugin.exportSaves(source, export_path)
+        print(f"Imported {plugin.importSaves(target, export_path, plugin.ImportConflictRule.KEEP_BOTH)}")
+
+        errors = check_ref_counts(target)
+        for index in range(0, args.mods, 2):
+            target.remove(f"mod {index}")
+        errors += check_ref_counts(target)
+        for index in range(1, args.mods, 2):
+            if any(len(save.steps) != 2 for _, save in target.loadVersions(f"mod {index}")):
+                errors.append(f"version of 'mod {index}' has missing steps")
+
+        if errors:
+            print("FAIL:\n" + "\n".join(f"  {error}" for error in errors[:20]))
+            sys.exit(1)
+        print(f"OK: {args.mods} mods")
+    finally:
+        shutil.rmtree(data_path, ignore_errors=True)
@@ -0,0 +1,32 @@
+import json
+from sys import exit
+from argparse import ArgumentParser
+
+from plugin_loader import load_plugin
+
+# Converts a single save or stored step between JSON and binary encodings, e.g. to inspect a binary step:
+#   python convert_save.py steps_v1/Skyrim/ab/ab12....bin - --encoding json
+if __name__ == "__main__":
+    plugin = load_plugin()
+
+    parser = ArgumentParser()
+    parser.add_argument('input', help='Save file in any encoding')
+    parser.add_argument('output', help="Output file, '-' to print")
+    parser.add_argument('--encoding', choices=plugin.SaveEncoding.ALL, default=plugin.SaveEncoding.JSON)
+    args = parser.parse_args()
+
+    save = plugin.readSaveFile(args.input)
+    if not save:
+        print(f"File '{args.input}' does not exist")
+        exit(1)
+
+    if args.encoding == plugin.SaveEncoding.JSON:
+        data = json.dumps(save.toDict(), indent=4).encode("utf-8")
+    else:
+        data = plugin.encodeSave(save, compress=args.encoding == plugin.SaveEncoding.BINARY_ZLIB)
+
+    if args.output == "-":
+        print(data.decode("utf-8") if args.encoding == plugin.SaveEncoding.JSON else data.hex())
+    else:
+        with open(args.output, "wb") as file:
+            file.write(data)
@@ -1,15 +1,89 @@
 import re
 import os
+import ast
+import sys
+import json
+import time
 import shutil
+import hashlib
+import tempfile
 import zipfile
+import subprocess
 from sys import exit
+from typing import Dict, List, Optional, Tuple
 from argparse import ArgumentParser, ArgumentTypeError
 
-SOURCE_DIR = "C:/dev/remember_installation_choices"
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+SOURCE_DIR = os.environ.get("RIC_SOURCE_DIR", os.path.dirname(SCRIPTS_DIR))
 SOURCES = [
     "__init__.py",
 ]
-BASE_BUILD_DIR = os.path.join(SOURCE_DIR, "builds")
+BASE_BUILD_DIR = os.environ.get("RIC_BUILD_DIR", os.path.join(SOURCE_DIR, "builds"))
+PACKAGE_NAME = "remember_installation_choices"
+MANIFEST_NAME = "build_manifest.json"
+
+# Zip entries get a fixed timestamp so that the same inputs always produce the same archive.
+# 'SOURCE_DATE_EPOCH' is honored, see https://reproducible-builds.org/specs/source-date-epoch/
+ZIP_EPOCH = int(os.environ.get("SOURCE_DATE_EPOCH", "315532800")) # 1980-01-01, earliest date zip supports
+
+class PythonTarget():
+    def __init__(self, cache_tag: str, version: Tuple[int, int], mo2_versions: str):
+        self.cache_tag = cache_tag
+        self.version = version
+        self.mo2_versions = mo2_versions
+
+    def env_var(self) -> str:
+        return "RIC_PYTHON_" + self.cache_tag.replace("cpython-", "CP")
+
+    def __str__(self) -> str:
+        return f"{self.cache_tag} (MO2 {self.mo2_versions})"
+
+# Python ABIs bundled with the MO2 versions we test against (see 'scripts/test_mo_*.bat').
+# Interpreter for every target is taken from 'RIC_PYTHON_CP<XY>' environment variable,
+# otherwise it is looked up in PATH (or with 'py' launcher on Windows).
+PYTHON_TARGETS = [
+    PythonTarget("cpython-38", (3, 8), "2.4.4"),
+    PythonTarget("cpython-312", (3, 12), "2.5.2"),
+]
+
+# Compiles a single source file with the interpreter of the target ABI. Hash-based pyc files
+# do not embed source mtime, which keeps them reproducible and still lets Python recompile them
+# if user edits the source.
+COMPILE_SCRIPT = """
+import sys
+import py_compile
+source, cfile, dfile = sys.argv[1:4]
+py_compile.compile(source, cfile=cfile, dfile=dfile, doraise=True, invalidation_mode=py_compile.PycInvalidationMode.CHECKED_HASH)
+"""
+
+# Imports built package with stand-in 'mobase' and checks that bytecode shipped for this ABI
+# matches the source, so Python will use it instead of compiling the plugin on first load.
+VERIFY_SCRIPT = """
+import os
+import sys
+import importlib.util
+scripts_dir, package_dir, expected_version = sys.argv[1:4]
+sys.dont_write_bytecode = True
+sys.path.insert(0, scripts_dir)
+from plugin_loader import load_plugin
+
+source_path = os.path.join(package_dir, "__init__.py")
+with open(source_path, "rb") as file:
+    source = file.read()
+with open(importlib.util.cache_from_source(source_path), "rb") as file:
+    header = file.read(16)
+if header[:4] != importlib.util.MAGIC_NUMBER:
+    sys.exit("bytecode was compiled for another Python version")
+if int.from_bytes(header[4:8], "little") != 0b11 or header[8:16] != importlib.util.source_hash(source):
+    sys.exit("bytecode does not match the source")
+
+module = load_plugin(package_dir)
+plugins = module.createPlugins() if hasattr(module, "createPlugins") else [module.createPlugin()]
+version = str(plugins[0].version())
+if version != expected_version:
+    sys.exit(f"plugin reports version {version}, expected {expected_version}")
+print(f"{plugins[0].name()} {version}")
+"""
 
 class Version():
     def __init__(self, version_string: str):
@@ -17,7 +91,7 @@ class Version():
         match = re.match(pattern, version_string)
         if not match:
             raise ArgumentTypeError(f"Invalid version format: '{version_string}'. Expected format is X.Y.Z.")
-        
+
         major, minor, patch = match.groups()
         self.major = int(major)
         self.minor = int(minor)
@@ -33,7 +107,7 @@ def update_version_in_init_py(init_py_path: str, version: Version) -> None:
     with open(init_py_path, 'r+') as file:
         content = file.readlines()
         in_version_block = False
-    
+
         for i, line in enumerate(content):
             if '# VERSION_BEGIN' in line.strip():
                 in_version_block = True
@@ -55,20 +129,173 @@ def update_version_in_init_py(init_py_path: str, version: Version) -> None:
         file.writelines(content)
         file.truncate() # Make sure to truncate if the new content is shorter than the original
 
+def strip_source(source: str) -> str:
+    """
+    Removes docstrings and comments, so the bytecode compiled from the result at default optimization
+    level is as small as '-OO' bytecode. MO2 does not run Python with '-O', so regular 'opt-2' pyc
+    files would never be picked up.
+    """
+    tree = ast.parse(source)
+    for node in ast.walk(tree):
+        if not isinstance(node, (ast.Module, ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        body = node.body
+        if body and isinstance(body[0], ast.Expr) and isinstance(body[0].value, ast.Constant) and isinstance(body[0].value.value, str):
+            body.pop(0)
+            if not body:
+                body.append(ast.Pass())
+    return ast.unparse(tree) + "\n"
+
+def file_digest(path: str) -> str:
+    with open(path, "rb") as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+def find_interpreter(target: PythonTarget) -> Optional[List[str]]:
+    candidates: List[List[str]] = []
+    if target.env_var() in os.environ:
+        candidates.append([os.environ[target.env_var()]])
+    if sys.version_info[:2] == target.version:
+        candidates.append([sys.executable])
+    major, minor = target.version
+    if os.name == "nt" and shutil.which("py"):
+        candidates.append(["py", f"-{major}.{minor}"])
+    if executable := shutil.which(f"python{major}.{minor}"):
+        candidates.append([executable])
+
+    for command in candidates:
+        try:
+            result = subprocess.run(
+                [*command, "-c", "import sys; print(sys.implementation.cache_tag, sys.version.split()[0])"],
+                capture_output=True, text=True,
+            )
+        except OSError:
+            continue
+        if result.returncode == 0 and result.stdout.split()[0] == target.cache_tag:
+            return command
+    return None
+
+def interpreter_version(command: List[str]) -> str:
+    return subprocess.run([*command, "-c", "import sys; print(sys.version)"], capture_output=True, text=True, check=True).stdout.strip()
+
+def has_pyqt(command: List[str]) -> bool:
+    # Plugin imports PyQt6 or PyQt5 at module level, MO2 ships them, standalone interpreters usually don't.
+    check = "import sys, importlib.util; sys.exit(0 if importlib.util.find_spec('PyQt6') or importlib.util.find_spec('PyQt5') else 1)"
+    return subprocess.run([*command, "-c", check], capture_output=True).returncode == 0
+
+class BuildManifest():
+    """
+    Remembers which inputs every build output was made from, so that unchanged outputs are not rebuilt.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.outputs: Dict[str, str] = {}
+        try:
+            with open(path, "r") as file:
+                self.outputs = json.load(file)["outputs"]
+        except (FileNotFoundError, KeyError, json.JSONDecodeError):
+            pass
+
+    def is_up_to_date(self, output_path: str, input_key: str) -> bool:
+        return os.path.exists(output_path) and self.outputs.get(self._key(output_path)) == input_key
+
+    def update(self, output_path: str, input_key: str) -> None:
+        self.outputs[self._key(output_path)] = input_key
+
+    def remove(self, output_path: str) -> None:
+        self.outputs.pop(self._key(output_path), None)
+
+    def save(self) -> None:
+        with open(self.path, "w") as file:
+            json.dump({"outputs": self.outputs}, file, indent=4, sort_keys=True)
+
+    def _key(self, output_path: str) -> str:
+        return os.path.relpath(output_path, os.path.dirname(self.path)).replace(os.sep, "/")
+
+def make_input_key(*parts: str) -> str:
+    return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+def remove_stale_files(directory: str, expected_paths: List[str]) -> List[str]:
+    """
+    Removes files that the current build didn't produce, e.g. bytecode of a target that was dropped.
+    """
+    expected = {os.path.normcase(os.path.abspath(path)) for path in expected_paths}
+    removed: List[str] = []
+    for foldername, dirnames, filenames in os.walk(directory, topdown=False):
+        for filename in filenames:
+            path = os.path.join(foldername, filename)
+            if os.path.normcase(os.path.abspath(path)) not in expected:
+                os.remove(path)
+                removed.append(path)
+        if foldername != directory and not os.listdir(foldername):
+            os.rmdir(foldername)
+    return removed
+
+def write_if_changed(path: str, content: bytes) -> bool:
+    try:
+        with open(path, "rb") as file:
+            if file.read() == content:
+                return False
+    except FileNotFoundError:
+        pass
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as file:
+        file.write(content)
+    return True
+
+def compile_for_target(interpreter: List[str], source_path: str, cfile: str, dfile: str) -> None:
+    os.makedirs(os.path.dirname(cfile), exist_ok=True)
+    subprocess.run([*interpreter, "-c", COMPILE_SCRIPT, source_path, cfile, dfile], check=True)
+
+def verify_package(interpreter: List[str], zip_path: str, version: Version) -> bool:
+    """
+    Extracts the zip the same way user installs it into MO2 plugins folder and imports the package from there.
+    """
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    with tempfile.TemporaryDirectory(prefix="ric_verify_") as plugins_dir:
+        with zipfile.ZipFile(zip_path, "r") as zipf:
+            zipf.extractall(plugins_dir)
+        package_dir = os.path.join(plugins_dir, PACKAGE_NAME)
+        if not os.path.isfile(os.path.join(package_dir, "__init__.py")):
+            print(f"'{zip_path}' has no '{PACKAGE_NAME}/__init__.py'")
+            return False
+        result = subprocess.run(
+            [*interpreter, "-c", VERIFY_SCRIPT, SCRIPTS_DIR, package_dir, f"{version}.0"],
+            capture_output=True, text=True, env=env,
+        )
+    if result.returncode != 0:
+        print(result.stdout + result.stderr)
+        return False
+    print(f"  {result.stdout.strip()}")
+    return True
+
 def zip_directory(zip_filename: str, directory_to_zip: str) -> None:
+    date_time = time.gmtime(ZIP_EPOCH)[:6]
+    paths: List[str] = []
+    for foldername, dirnames, filenames in os.walk(directory_to_zip):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            paths.append(os.path.join(foldername, filename))
+
     with zipfile.ZipFile(zip_filename, 'w', zipfile.ZIP_DEFLATED) as zipf:
-        for foldername, _, filenames in os.walk(directory_to_zip):
-            for filename in filenames:
-                file_path = os.path.join(foldername, filename)
-                zipf.write(file_path, os.path.relpath(file_path, directory_to_zip))
+        for file_path in paths:
+            info = zipfile.ZipInfo(os.path.relpath(file_path, directory_to_zip).replace(os.sep, "/"), date_time)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.create_system = 0
+            info.external_attr = 0o644 << 16
+            with open(file_path, "rb") as file:
+                zipf.writestr(info, file.read())
 
 if __name__ == "__main__":
     parser = ArgumentParser()
     parser.add_argument('version', type=version_parser)
     parser.add_argument('--allow-overwrite', action='store_true', help='Allow overwriting of existing files')
+    parser.add_argument('--clean', action='store_true', help='Remove existing build directory instead of updating it incrementally')
+    parser.add_argument('--skip-verify', action='store_true', help='Do not import built package to check it')
+    parser.add_argument('--allow-missing-targets', action='store_true', help='Build without bytecode for Python targets whose interpreter is missing, instead of failing')
     args = parser.parse_args()
 
     print(f"Version: {args.version}")
+    print(f"Using source directory: {SOURCE_DIR}")
 
     build_dir = os.path.join(BASE_BUILD_DIR, str(args.version))
     print(f"Using build directory: {build_dir}")
@@ -76,21 +303,85 @@ if __name__ == "__main__":
     if os.path.exists(build_dir):
         if not args.allow_overwrite:
             print(f"Directory for version {args.version} already exists ({build_dir}).")
-            print(f"Use '--allow-overwrite' to overwrite directory.")
+            print("Use '--allow-overwrite' to update directory.")
             exit(1)
-        shutil.rmtree(build_dir)
+        if args.clean:
+            shutil.rmtree(build_dir)
+    os.makedirs(build_dir, exist_ok=True)
 
-    output_dir = os.path.join(build_dir, "zip/remember_installation_choices")
-    os.makedirs(output_dir)
+    update_version_in_init_py(os.path.join(SOURCE_DIR, "__init__.py"), args.version)
 
-    for file_name in SOURCES:
-        src = os.path.join(SOURCE_DIR, file_name)
-        dst = os.path.join(output_dir, file_name)
-        shutil.copy(src, dst)
+    targets: List[Tuple[PythonTarget, List[str], str]] = []
+    # Interpreters without PyQt can compile bytecode, but can't import the plugin to verify it.
+    unverifiable_targets: List[PythonTarget] = []
+    for target in PYTHON_TARGETS:
+        interpreter = find_interpreter(target)
+        if not interpreter:
+            print(f"No interpreter found for {target}, set '{target.env_var()}' to its python.exe")
+            if not args.allow_missing_targets:
+                print("Use '--allow-missing-targets' to build without bytecode for it.")
+                exit(1)
+            continue
+        print(f"Target {target}: {' '.join(interpreter)}")
+        targets.append((target, interpreter, interpreter_version(interpreter)))
+        if not args.skip_verify and not has_pyqt(interpreter):
+            print(f"PyQt6 or PyQt5 is not installed for {target}, package will not be verified with it (e.g. '{' '.join(interpreter)} -m pip install PyQt6')")
+            unverifiable_targets.append(target)
 
-    update_version_in_init_py(os.path.join(output_dir, "__init__.py"), args.version)
-    update_version_in_init_py(os.path.join(SOURCE_DIR, "__init__.py"), args.version)
+    manifest = BuildManifest(os.path.join(build_dir, MANIFEST_NAME))
+    failed = False
+    for variant, zip_name in (
+        ("zip", f"{PACKAGE_NAME}.zip"),
+        ("zip_optimized", f"{PACKAGE_NAME}-optimized.zip"),
+    ):
+        staging_dir = os.path.join(build_dir, variant)
+        output_dir = os.path.join(staging_dir, PACKAGE_NAME)
+        changed = False
+        expected_paths: List[str] = []
+
+        for file_name in SOURCES:
+            with open(os.path.join(SOURCE_DIR, file_name), "r", encoding="utf-8") as file:
+                source = file.read()
+            if variant == "zip_optimized":
+                source = strip_source(source)
+            dst = os.path.join(output_dir, file_name)
+            changed |= write_if_changed(dst, source.encode("utf-8"))
+            expected_paths.append(dst)
+
+            source_digest = file_digest(dst)
+            for target, interpreter, full_version in targets:
+                module_name, _ = os.path.splitext(file_name)
+                cfile = os.path.join(output_dir, "__pycache__", f"{module_name}.{target.cache_tag}.pyc")
+                expected_paths.append(cfile)
+                input_key = make_input_key(source_digest, full_version)
+                if manifest.is_up_to_date(cfile, input_key):
+                    continue
+                compile_for_target(interpreter, dst, cfile, f"{PACKAGE_NAME}/{file_name}")
+                manifest.update(cfile, input_key)
+                changed = True
+                print(f"Compiled '{os.path.relpath(cfile, build_dir)}'")
+
+        for path in remove_stale_files(staging_dir, expected_paths):
+            manifest.remove(path)
+            changed = True
+            print(f"Removed '{os.path.relpath(path, build_dir)}', it is not part of the build anymore")
+
+        zip_path = os.path.join(build_dir, zip_name)
+        if changed or not os.path.exists(zip_path):
+            zip_directory(zip_path, staging_dir)
+            print(f"Created zip file with build: {zip_path}")
+        else:
+            print(f"Zip file is up to date: {zip_path}")
+
+        if not args.skip_verify:
+            for target, interpreter, _ in targets:
+                if target in unverifiable_targets:
+                    print(f"Not verifying '{zip_name}' with {target}: PyQt is not installed for it")
+                    continue
+                print(f"Verifying '{zip_name}' with {target}")
+                failed |= not verify_package(interpreter, zip_path, args.version)
 
-    zip_path = os.path.join(build_dir, "remember_installation_choices.zip")
-    zip_directory(zip_path, os.path.join(build_dir, "zip"))
-    print(f"Created zip file with build: {zip_path}")
+    manifest.save()
+    if failed:
+        print("Verification failed")
+        exit(1)
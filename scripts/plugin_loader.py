@@ -0,0 +1,37 @@
+import os
+import sys
+import importlib.util
+from types import ModuleType
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+STUBS_DIR = os.path.join(SCRIPTS_DIR, "stubs")
+REPO_DIR = os.path.dirname(SCRIPTS_DIR)
+PACKAGE_NAME = "remember_installation_choices"
+
+def load_plugin(package_dir: str = REPO_DIR) -> ModuleType:
+    """
+    Imports plugin package from 'package_dir' outside of Mod Organizer 2, using stand-in 'mobase'
+    from 'scripts/stubs' unless the real one is importable.
+    """
+    if PACKAGE_NAME in sys.modules:
+        return sys.modules[PACKAGE_NAME]
+
+    try:
+        import mobase # noqa: F401
+    except ImportError:
+        sys.path.insert(0, STUBS_DIR)
+
+    spec = importlib.util.spec_from_file_location(
+        PACKAGE_NAME,
+        os.path.join(package_dir, "__init__.py"),
+        submodule_search_locations=[package_dir],
+    )
+    assert spec and spec.loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[PACKAGE_NAME] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[PACKAGE_NAME]
+        raise
+    return module
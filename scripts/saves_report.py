@@ -0,0 +1,19 @@
+from argparse import ArgumentParser
+
+from plugin_loader import load_plugin
+
+# Prints how much disk space step deduplication saves for a game, e.g.:
+#   python saves_report.py "C:/MO2/plugins/data" "Skyrim Special Edition" --deduplicate
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument('plugin_data_path', help="MO2 plugin data folder ('plugins/data' in MO2 folder)")
+    parser.add_argument('game', help='Game name as MO2 reports it')
+    parser.add_argument('--deduplicate', action='store_true', help='Convert saves that still contain full steps before reporting')
+    args = parser.parse_args()
+
+    plugin = load_plugin()
+    store = plugin.SaveStore.fromPluginDataPath(args.plugin_data_path, args.game)
+
+    if args.deduplicate:
+        print(f"Deduplicated {store.deduplicate()} saves")
+    print(store.statistics())
@@ -0,0 +1,227 @@
+import gc
+import os
+import sys
+import time
+import shutil
+import random
+import tempfile
+import tracemalloc
+from argparse import ArgumentParser
+from typing import Dict, List, Optional
+
+# Dialogs are never shown on screen.
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from plugin_loader import load_plugin
+
+plugin = load_plugin()
+# Every dialog logs several lines, soak test would spend most of its time printing them.
+plugin.logDebug = lambda s: None
+
+try:
+    from PyQt6 import sip
+    from PyQt6.QtWidgets import QApplication, QWidget, QVBoxLayout, QHBoxLayout, QComboBox, QStackedWidget, QGroupBox, QRadioButton, QCheckBox, QPushButton
+    from PyQt6.QtCore import QEvent
+except ImportError:
+    from PyQt5 import sip
+    from PyQt5.QtWidgets import QApplication, QWidget, QVBoxLayout, QHBoxLayout, QComboBox, QStackedWidget, QGroupBox, QRadioButton, QCheckBox, QPushButton
+    from PyQt5.QtCore import QEvent
+
+GAME = "Soak Test"
+
+class Game():
+    def gameName(self) -> str:
+        return GAME
+
+class Mod():
+    def __init__(self, name: str):
+        self._name = name
+
+    def name(self) -> str:
+        return self._name
+
+class Organizer():
+    def __init__(self, data_path: str, settings: Dict[str, object]):
+        self._data_path = data_path
+        self._settings = settings
+
+    def pluginDataPath(self) -> str:
+        return self._data_path
+
+    def managedGame(self) -> Game:
+        return Game()
+
+    def pluginSetting(self, plugin_name: str, key: str) -> object:
+        return self._settings[key]
+
+def make_dialog(rng: random.Random, mod_name: str, num_steps: int) -> QWidget:
+    """
+    Builds widget tree with the same object names as MO2 FOMOD installer dialog.
+    """
+    widget = QWidget()
+    widget.setObjectName("FomodInstallerDialog")
+    layout = QVBoxLayout(widget)
+    top = QHBoxLayout()
+    layout.addLayout(top)
+    name_combo = QComboBox(widget)
+    name_combo.setObjectName("nameCombo")
+    name_combo.setEditable(True)
+    name_combo.addItems([mod_name, mod_name + " - Main File"])
+    top.addWidget(name_combo)
+
+    steps_stack = QStackedWidget(widget)
+    steps_stack.setObjectName("stepsStack")
+    layout.addWidget(steps_stack)
+    for step_index in range(num_steps):
+        step = QGroupBox(f"Step {step_index}", steps_stack)
+        step_layout = QVBoxLayout(step)
+        for group_index in range(rng.randint(1, 4)):
+            group = QGroupBox(f"Group {group_index}", step)
+            group_layout = QVBoxLayout(group)
+            radio = rng.random() < 0.5
+            for choice_index in range(rng.randint(2, 8)):
+                choice = QRadioButton(f"Option {choice_index}", group) if radio else QCheckBox(f"Option {choice_index}", group)
+                choice.setObjectName("choice")
+                choice.setChecked(rng.random() < 0.3)
+                group_layout.addWidget(choice)
+            step_layout.addWidget(group)
+        steps_stack.addWidget(step)
+
+    prev_button = QPushButton("Back", widget)
+    prev_button.setObjectName("prevBtn")
+    next_button = QPushButton("Next" if num_steps > 1 else "Install", widget)
+    next_button.setObjectName("nextBtn")
+    layout.addWidget(prev_button)
+    layout.addWidget(next_button)
+
+    # MO2 connects its handlers before plugin finds the dialog, so they run first. They are C++ slots in MO2,
+    # this one is disconnected before dialog is deleted, so that only connections made by plugin are measured.
+    def next_step() -> None:
+        if steps_stack.currentIndex() + 1 < steps_stack.count():
+            steps_stack.setCurrentIndex(steps_stack.currentIndex() + 1)
+        if steps_stack.currentIndex() + 1 == steps_stack.count():
+            next_button.setText("Install")
+    next_button.clicked.connect(next_step)
+    widget.show()
+    return widget
+
+def run_install(plugin_instance: "plugin.RememberModChoicesPlugin", rng: random.Random, mod_name: str) -> None:
+    widget = make_dialog(random.Random(hash(mod_name)), mod_name, num_steps=3)
+    plugin_instance._findInstallerDialog([widget])
+    # Save is loaded on a worker thread and applied from event loop.
+    dialog = plugin_instance.currentInstallerDialog
+    deadline = time.perf_counter() + 5
+    while dialog and not dialog._prefetchedSave and time.perf_counter() < deadline:
+        QApplication.processEvents()
+        time.sleep(0.001)
+    next_button = widget.findChild(QPushButton, "nextBtn")
+    for _ in range(3):
+        for choice in widget.findChildren(QCheckBox):
+            if rng.random() < 0.2:
+                choice.setChecked(not choice.isChecked())
+        next_button.click()
+    next_button.clicked.disconnect()
+    # Dialog is deleted by MO2 after installation, then mod is installed. PyQt deletes disconnected slots with
+    # 'deleteLater', MO2 event loop would delete them before next dialog is opened.
+    sip.delete(widget)
+    QApplication.sendPostedEvents(None, QEvent.Type.DeferredDelete)
+    if plugin_instance.pendingSave:
+        plugin_instance._onModInstalled(Mod(mod_name))
+
+def current_rss() -> Optional[int]:
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm", "r") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+def settle(store: "plugin.SaveStore", mod_names: List[str]) -> None:
+    """
+    Applies journal and loads saves of every mod before a measurement, so that it always includes a full cache
+    of saves, whichever mods were installed last.
+    """
+    store.flush()
+    for mod_name in mod_names:
+        store.load(mod_name)
+    gc.collect()
+
+def count_objects() -> Dict[str, int]:
+    counts: Dict[str, int] = {}
+    for obj in gc.get_objects():
+        name = type(obj).__name__
+        counts[name] = counts.get(name, 0) + 1
+    return counts
+
+# Opens, clicks through and closes thousands of synthetic installer dialogs in one process, like a long MO2 session,
+# and checks that Python objects, traced allocations and RSS stop growing after warmup, e.g.:
+#   python soak_installer_dialogs.py --dialogs 5000
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument('--dialogs', type=int, default=2000)
+    parser.add_argument('--warmup', type=int, default=200, help='Dialogs before the baseline in addition to one for every mod, caches fill up during them')
+    parser.add_argument('--mods', type=int, default=100, help='Installed mods are picked from this many names')
+    parser.add_argument('--max-objects', type=int, default=500, help='Allowed growth of Python object count')
+    parser.add_argument('--max-traced-kib', type=int, default=512, help='Allowed growth of memory traced by tracemalloc')
+    parser.add_argument('--max-rss-mib', type=int, default=16, help='Allowed growth of RSS')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv[:1])
+    data_path = tempfile.mkdtemp(prefix="ric_soak_")
+    try:
+        plugin_instance = plugin.RememberModChoicesPlugin()
+        settings = {setting.key: setting.default_value for setting in plugin_instance.settings()}
+        plugin_instance._organizer = Organizer(data_path, settings)
+        rng = random.Random(args.seed)
+        mod_names = [f"Soak Mod {index}" for index in range(args.mods)]
+
+        # Every mod gets a save during warmup, so that cached saves don't grow when a mod is installed for the first time.
+        for mod_name in mod_names + [rng.choice(mod_names) for _ in range(args.warmup)]:
+            run_install(plugin_instance, rng, mod_name)
+        # Cached saves of the baseline are traced too, they are replaced by later measurements.
+        tracemalloc.start()
+        settle(plugin_instance.saveStore(), mod_names)
+        baseline_objects = count_objects()
+        baseline_snapshot = tracemalloc.take_snapshot()
+        baseline_rss = current_rss()
+
+        print(f"{'dialogs':>8}{'objects':>10}{'traced, KiB':>13}{'rss, MiB':>10}")
+        report_every = max(1, args.dialogs // 10)
+        for index in range(1, args.dialogs + 1):
+            run_install(plugin_instance, rng, rng.choice(mod_names))
+            if index % report_every == 0 or index == args.dialogs:
+                settle(plugin_instance.saveStore(), mod_names)
+                objects = sum(count_objects().values()) - sum(baseline_objects.values())
+                traced = sum(stat.size_diff for stat in tracemalloc.take_snapshot().compare_to(baseline_snapshot, "filename"))
+                rss = current_rss()
+                rss_growth = (rss - baseline_rss) / 1024 / 1024 if rss is not None and baseline_rss is not None else float("nan")
+                print(f"{index:>8}{objects:>10}{traced / 1024:>13.1f}{rss_growth:>10.1f}")
+
+        final_objects = count_objects()
+        final_snapshot = tracemalloc.take_snapshot()
+        failures: List[str] = []
+        grown = sorted(((final_objects.get(name, 0) - baseline_objects.get(name, 0), name) for name in final_objects), reverse=True)
+        if sum(final_objects.values()) - sum(baseline_objects.values()) > args.max_objects:
+            failures.append("object count grew: " + ", ".join(f"{name} +{count}" for count, name in grown[:5]))
+        stats = final_snapshot.compare_to(baseline_snapshot, "lineno")
+        if sum(stat.size_diff for stat in stats) > args.max_traced_kib * 1024:
+            failures.append("traced memory grew, top allocation sites:\n" + "\n".join(f"  {stat}" for stat in stats[:5]))
+        rss = current_rss()
+        if rss is not None and baseline_rss is not None and rss - baseline_rss > args.max_rss_mib * 1024 * 1024:
+            failures.append(f"RSS grew by {(rss - baseline_rss) / 1024 / 1024:.1f} MiB")
+        # Every mod was loaded by 'settle', cache keeps only the last ones.
+        cached_saves = plugin_instance.saveStore().cachedSaveCount()
+        if cached_saves > plugin.SaveStore.CACHE_SIZE:
+            failures.append(f"{cached_saves} saves are cached, limit is {plugin.SaveStore.CACHE_SIZE}")
+
+        if failures:
+            print("FAIL: " + "\n".join(failures))
+            sys.exit(1)
+        print(f"OK: {args.dialogs} dialogs after {len(mod_names) + args.warmup} warmup dialogs")
+    finally:
+        shutil.rmtree(data_path, ignore_errors=True)
@@ -0,0 +1,157 @@
+import time
+import random
+import shutil
+import tempfile
+import multiprocessing
+from argparse import ArgumentParser
+from typing import Dict, List
+
+from plugin_loader import load_plugin
+
+plugin = load_plugin()
+# Every load logs the paths it checks, missing steps are counted instead of logged.
+plugin.logDebug = lambda s: None
+plugin.logCritical = lambda s: None
+
+GAME = "Stress Test"
+NUM_SHARED_MODS = 4
+# Steps that are shared by saves of different mods, their reference counts are changed by every process.
+SHARED_STEP_VARIANTS = 8
+
+def make_store(data_path: str, journal: bool) -> "plugin.SaveStore":
+    store = plugin.SaveStore.fromPluginDataPath(data_path, GAME, historySize=2)
+    if not journal:
+        # Same as the store before journal: only threads of one process are synchronized.
+        store = plugin.SaveStore(store.savesFolder, store.stepsFolder, store.legacySavesFolder, store.encoding, store.historyFolder, store.historySize)
+    return store
+
+def make_save(rng: random.Random, marker: str) -> "plugin.FomodSave":
+    shared = rng.randrange(SHARED_STEP_VARIANTS)
+    return plugin.FomodSave({"steps": [
+        {"title": "Textures", "widgetIndex": 0, "groups": [{"title": "Resolution", "widgetIndex": 0, "choices": [
+            {"text": f"{2 ** index}K", "widgetIndex": index, "isChecked": index == shared % 4} for index in range(4)
+        ]}]},
+        {"title": "Marker", "widgetIndex": 1, "groups": [{"title": "Marker", "widgetIndex": 0, "choices": [
+            {"text": marker, "widgetIndex": 0, "isChecked": True},
+            {"text": f"variant {shared}", "widgetIndex": 1, "isChecked": False},
+        ]}]},
+    ]})
+
+def get_marker(save: "plugin.FomodSave") -> str:
+    step = save.findStep("Marker", 1)
+    return step.groups[0].choices[0].text if step and step.groups and step.groups[0].choices else ""
+
+def writer(worker: int, data_path: str, journal: bool, num_ops: int, num_mods: int, seed: int, results: "multiprocessing.Queue") -> None:
+    rng = random.Random(seed * 1000 + worker)
+    store = make_store(data_path, journal)
+    # Current name of every own mod and marker of its last save, same as MO2 instance would remember them.
+    expected: Dict[str, str] = {}
+    shared_markers: List[str] = []
+    names = [f"w{worker} mod {index}" for index in range(num_mods)]
+    start = time.perf_counter()
+    for op in range(num_ops):
+        marker = f"w{worker} op {op}"
+        roll = rng.random()
+        if roll < 0.6 or not expected:
+            # Install, as '_onModInstalled' does it.
+            name = rng.choice(names)
+            store.load(name)
+            store.write(name, make_save(rng, marker))
+            expected[name] = marker
+        elif roll < 0.8:
+            name = f"shared {rng.randrange(NUM_SHARED_MODS)}"
+            store.write(name, make_save(rng, marker))
+            shared_markers.append(marker)
+        else:
+            old_name = rng.choice(sorted(expected))
+            new_name = old_name[:-len(" (renamed)")] if old_name.endswith(" (renamed)") else old_name + " (renamed)"
+            if store.rename(old_name, new_name):
+                expected[new_name] = expected.pop(old_name)
+                names[names.index(old_name)] = new_name
+    results.put({"worker": worker, "seconds": time.perf_counter() - start, "ops": num_ops, "expected": expected, "shared": shared_markers})
+
+def reader(data_path: str, journal: bool, num_workers: int, num_mods: int, stop: "multiprocessing.Event", results: "multiprocessing.Queue") -> None:
+    rng = random.Random(0)
+    store = make_store(data_path, journal)
+    latencies: List[float] = []
+    while not stop.is_set():
+        name = f"w{rng.randrange(num_workers)} mod {rng.randrange(num_mods)}"
+        start = time.perf_counter()
+        try:
+            store.load(name)
+        except Exception:
+            # Reading a file while another process replaces it without journal.
+            pass
+        latencies.append(time.perf_counter() - start)
+    results.put({"reads": len(latencies), "max": max(latencies, default=0.0), "mean": sum(latencies) / max(1, len(latencies))})
+
+def run(journal: bool, num_workers: int, num_ops: int, num_mods: int, seed: int) -> None:
+    data_path = tempfile.mkdtemp(prefix="ric_stress_")
+    try:
+        context = multiprocessing.get_context("spawn")
+        results = context.Queue()
+        reader_results = context.Queue()
+        stop = context.Event()
+        workers = [context.Process(target=writer, args=(worker, data_path, journal, num_ops, num_mods, seed, results)) for worker in range(num_workers)]
+        reader_process = context.Process(target=reader, args=(data_path, journal, num_workers, num_mods, stop, reader_results))
+        reader_process.start()
+        start = time.perf_counter()
+        for process in workers:
+            process.start()
+        worker_results = [results.get() for _ in workers]
+        elapsed = time.perf_counter() - start
+        for process in workers:
+            process.join()
+        stop.set()
+        reads = reader_results.get()
+        reader_process.join()
+
+        store = make_store(data_path, journal)
+        store.flush()
+        # Own saves of a process are changed only by it, so its last write has to be there.
+        lost_updates = 0
+        missing_steps = 0
+        for result in worker_results:
+            for name, marker in result["expected"].items():
+                save = store.load(name)
+                if not save or get_marker(save) != marker:
+                    lost_updates += 1
+                elif len(save.steps) != 2:
+                    missing_steps += 1
+        shared_markers = {marker for result in worker_results for marker in result["shared"]}
+        for index in range(NUM_SHARED_MODS):
+            save = store.load(f"shared {index}")
+            if save and get_marker(save) not in shared_markers:
+                lost_updates += 1
+
+        # Counts as the store knows them, from 'refcounts.json'.
+        store._refCounts = None
+        ref_counts = store._loadRefCounts()
+        actual_ref_counts = store._countStepRefs()
+        ref_count_errors = sum(1 for step_hash in set(ref_counts) | set(actual_ref_counts) if ref_counts.get(step_hash) != actual_ref_counts.get(step_hash))
+
+        total_ops = sum(result["ops"] for result in worker_results)
+        mode = "journal" if journal else "unlocked"
+        print(
+            f"{mode:<10}{num_workers:>10}{total_ops:>8}{total_ops / elapsed:>10.0f}{reads['reads']:>8}"
+            f"{reads['mean'] * 1000:>11.3f}{reads['max'] * 1000:>10.1f}{lost_updates:>7}{missing_steps:>9}{ref_count_errors:>10}"
+        )
+    finally:
+        shutil.rmtree(data_path, ignore_errors=True)
+
+# Runs several processes that install and rename mods in one plugin data folder, like MO2 instances that share it,
+# while another process reads saves. Reports throughput, read latency, lost updates (saves that are not the last one
+# their process wrote), saves with missing steps and wrong step reference counts, e.g.:
+#   python stress_save_store.py --processes 8 --ops 500
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--ops', type=int, default=300, help='Installs and renames per process')
+    parser.add_argument('--mods', type=int, default=20, help='Mods per process')
+    parser.add_argument('--mode', choices=['journal', 'unlocked', 'both'], default='both')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{'mode':<10}{'processes':>10}{'ops':>8}{'ops/s':>10}{'reads':>8}{'read, ms':>11}{'max, ms':>10}{'lost':>7}{'missing':>9}{'refcounts':>10}")
+    for journal in ([True, False] if args.mode == 'both' else [args.mode == 'journal']):
+        run(journal, args.processes, args.ops, args.mods, args.seed)
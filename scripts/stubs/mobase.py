@@ -0,0 +1,106 @@
+# Stand-in for the 'mobase' module that Mod Organizer 2 injects into its embedded Python.
+# Only covers what the plugin touches at import time and when it is constructed, so that
+# build artifacts and benchmarks can be imported outside of MO2.
+from enum import Enum
+from typing import Callable, List
+
+
+class VersionInfo():
+    def __init__(self, major: int = 0, minor: int = 0, subminor: int = 0, subsubminor: int = 0):
+        self.major = major
+        self.minor = minor
+        self.subminor = subminor
+        self.subsubminor = subsubminor
+
+    def __str__(self) -> str:
+        return f"{self.major}.{self.minor}.{self.subminor}.{self.subsubminor}"
+
+
+class PluginSetting():
+    def __init__(self, key: str, description: str, default_value: object):
+        self.key = key
+        self.description = description
+        self.default_value = default_value
+
+
+class InstallResult(Enum):
+    SUCCESS = 0
+    FAILED = 1
+    CANCELED = 2
+    MANUAL_REQUESTED = 3
+    NOT_ATTEMPTED = 4
+
+
+class GuessedString():
+    pass
+
+
+class IFileTree():
+    pass
+
+
+class IModInterface():
+    def name(self) -> str:
+        raise NotImplementedError
+
+
+class IModList():
+    def allMods(self) -> List[str]:
+        raise NotImplementedError
+
+    def onModInstalled(self, callback: Callable[[IModInterface], None]) -> bool:
+        raise NotImplementedError
+
+
+class IGameFeatures():
+    pass
+
+
+class IPluginGame():
+    def gameName(self) -> str:
+        raise NotImplementedError
+
+
+class IOrganizer():
+    def pluginDataPath(self) -> str:
+        raise NotImplementedError
+
+    def modsPath(self) -> str:
+        raise NotImplementedError
+
+    def managedGame(self) -> IPluginGame:
+        raise NotImplementedError
+
+    def modList(self) -> IModList:
+        raise NotImplementedError
+
+    def pluginSetting(self, plugin_name: str, key: str) -> object:
+        raise NotImplementedError
+
+    def onUserInterfaceInitialized(self, callback: Callable[[object], None]) -> bool:
+        raise NotImplementedError
+
+
+class IPlugin():
+    def __init__(self):
+        pass
+
+
+class IPluginTool(IPlugin):
+    def setParentWidget(self, widget: object) -> None:
+        self._parent = widget
+
+    def _parentWidget(self) -> object:
+        return getattr(self, "_parent", None)
+
+
+class IPluginInstaller(IPlugin):
+    def setParentWidget(self, widget: object) -> None:
+        self._parent = widget
+
+    def _parentWidget(self) -> object:
+        return getattr(self, "_parent", None)
+
+
+class IPluginInstallerSimple(IPluginInstaller):
+    pass
@@ -0,0 +1,33 @@
+import os
+from argparse import ArgumentParser
+
+from plugin_loader import load_plugin
+
+# Exports or imports all saves of a game, same as 'Export/Import Installation Choices' tools in MO2,
+# choice statistics are rebuilt after import, e.g.:
+#   python transfer_saves.py export "C:/MO2/plugins/data" "Skyrim Special Edition" choices.ndjson
+#   python transfer_saves.py import "D:/MO2/plugins/data" "Skyrim Special Edition" choices.ndjson --conflict keep_both
+if __name__ == "__main__":
+    plugin = load_plugin()
+
+    parser = ArgumentParser()
+    parser.add_argument('command', choices=['export', 'import'])
+    parser.add_argument('plugin_data_path', help="MO2 plugin data folder ('plugins/data' in MO2 folder)")
+    parser.add_argument('game', help='Game name as MO2 reports it')
+    parser.add_argument('file', help="Exported saves, '.zip' is archive, anything else is NDJSON")
+    parser.add_argument('--format', choices=plugin.SaveTransferFormat.ALL, help='Override format detected from file extension')
+    parser.add_argument('--conflict', choices=plugin.ImportConflictRule.ALL, default=plugin.ImportConflictRule.NEWEST_WINS)
+    parser.add_argument('--history-size', type=int, default=5, help="Same as plugin 'history_size' setting, used on import")
+    args = parser.parse_args()
+
+    store = plugin.SaveStore.fromPluginDataPath(args.plugin_data_path, args.game, historySize=args.history_size)
+    if args.command == 'export':
+        print(f"Exported {plugin.exportSaves(store, args.file, args.format)}")
+    else:
+        print(f"Imported {plugin.importSaves(store, args.file, args.conflict, args.format)}")
+        statistics = plugin.ChoiceStatistics(os.path.join(
+            plugin.getGameDataFolder(args.plugin_data_path, "stats_v1", args.game),
+            "choices.json",
+        ), store)
+        statistics.rebuild()
+        print(f"Rebuilt choice statistics at '{statistics.path}'")